@@ -3,15 +3,16 @@ import logging
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from sqlalchemy import func
+from sqlalchemy import func, case, or_, and_
 
 from app import db
 from models.employee import Employee
-from models.payroll import Payroll
+from models.payroll import Payroll, PayrollMonthlyRollup
 from models.attendance import Attendance
 from models.leave import Leave
 from .predictive_models import SalaryPredictor, AttendancePredictor
 from .nlp_processor import NLPProcessor
+from services.periods import month_bounds, within_period, overlaps_period
 
 logger = logging.getLogger(__name__)
 
@@ -19,45 +20,17 @@ class PayrollAgent:
     """
     AI agent that handles intelligent payroll processing and analysis
     """
-    def __init__(self):
+    def __init__(self, model_dir=None):
         self.nlp_processor = NLPProcessor()
-        self.salary_predictor = SalaryPredictor()
+        self.salary_predictor = SalaryPredictor(model_dir=model_dir)
         self.attendance_predictor = AttendancePredictor()
     
-    def analyze_payroll_trends(self, months=12):
+    def analyze_payroll_trends(self, months=12, company_id=None, department=None):
         """
         Analyze payroll trends over the specified number of months
         """
         try:
-            # Get current date
-            now = datetime.now()
-            start_date = now - timedelta(days=30 * months)
-            
-            # Query payroll data
-            payroll_data = db.session.query(
-                Payroll.month,
-                Payroll.year,
-                func.avg(Payroll.gross_salary).label('avg_gross'),
-                func.avg(Payroll.net_salary).label('avg_net'),
-                func.avg(Payroll.tax_deduction).label('avg_tax'),
-                func.count(Payroll.id).label('count')
-            ).filter(
-                Payroll.payment_date >= start_date
-            ).group_by(
-                Payroll.year, Payroll.month
-            ).all()
-            
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame([
-                {
-                    'month': f"{row.year}-{row.month:02d}",
-                    'avg_gross': float(row.avg_gross),
-                    'avg_net': float(row.avg_net),
-                    'avg_tax': float(row.avg_tax),
-                    'count': int(row.count)
-                }
-                for row in payroll_data
-            ])
+            df = self._monthly_payroll_frame(months, company_id, department)
             
             if df.empty:
                 return {
@@ -66,7 +39,6 @@ class PayrollAgent:
                 }
             
             # Perform trend analysis
-            df['month'] = pd.to_datetime(df['month'] + '-01')
             df = df.sort_values('month')
             
             # Calculate growth rates
@@ -130,15 +102,49 @@ class PayrollAgent:
                 'message': f"Analysis failed: {str(e)}"
             }
     
+    def _monthly_payroll_frame(self, months, company_id=None, department=None):
+        """
+        Monthly payroll averages read straight from the maintained rollup table
+        """
+        start_date = datetime.now() - timedelta(days=30 * months)
+        rollup = PayrollMonthlyRollup
+        payroll_count = func.sum(rollup.payroll_count)
+        
+        query = db.session.query(
+            rollup.year,
+            rollup.month,
+            (func.sum(rollup.total_gross) / payroll_count).label('avg_gross'),
+            (func.sum(rollup.total_net) / payroll_count).label('avg_net'),
+            (func.sum(rollup.total_tax) / payroll_count).label('avg_tax'),
+            payroll_count.label('count')
+        ).filter(
+            or_(rollup.year > start_date.year,
+                and_(rollup.year == start_date.year, rollup.month >= start_date.month))
+        )
+        if company_id is not None:
+            query = query.filter(rollup.company_id == company_id)
+        if department is not None:
+            query = query.filter(rollup.department == department)
+        query = query.group_by(rollup.year, rollup.month).having(payroll_count > 0)
+        
+        df = pd.read_sql(query.statement, db.session.connection())
+        if df.empty:
+            return df
+        
+        df['month'] = pd.to_datetime(pd.DataFrame({'year': df['year'], 'month': df['month'], 'day': 1}))
+        df = df.drop(columns='year').astype({'avg_gross': float, 'avg_net': float, 'avg_tax': float, 'count': int})
+        return df[['month', 'avg_gross', 'avg_net', 'avg_tax', 'count']]
+    
     def optimize_payroll_process(self, employee_ids=None):
         """
         Analyze and optimize the payroll processing for specified employees
         """
         try:
-            # If no employee IDs are specified, get all active employees
+            # If no employee IDs are specified, take every employee (the model
+            # has no employment status); the aggregate queries below scope
+            # themselves with a subquery
             if not employee_ids:
-                employees = Employee.query.filter_by(employment_status='active').all()
-                employee_ids = [emp.id for emp in employees]
+                employees = Employee.query.all()
             else:
                 employees = Employee.query.filter(Employee.id.in_(employee_ids)).all()
             
@@ -147,34 +153,19 @@ class PayrollAgent:
             current_month = now.month
             current_year = now.year
             
+            # Per-employee aggregates, fetched with one grouped query each
+            attendance_stats = self._attendance_totals(employee_ids, current_month, current_year)
+            leave_totals = self._approved_leave_days(employee_ids, current_month, current_year)
+            avg_salaries = self._average_paid_gross(employee_ids)
+            
             results = []
             for employee in employees:
-                # Get attendance data for current month
-                attendance_data = Attendance.query.filter(
-                    Attendance.employee_id == employee.id,
-                    func.extract('month', Attendance.date) == current_month,
-                    func.extract('year', Attendance.date) == current_year
-                ).all()
-                
-                # Calculate working days, overtime, etc.
-                working_days = len([a for a in attendance_data if a.status in ['present', 'late']])
-                overtime_hours = sum([a.overtime_hours for a in attendance_data])
-                
-                # Get leave data
-                leave_data = Leave.query.filter(
-                    Leave.employee_id == employee.id,
-                    Leave.status == 'approved',
-                    (func.extract('month', Leave.start_date) == current_month or 
-                     func.extract('month', Leave.end_date) == current_month),
-                    (func.extract('year', Leave.start_date) == current_year or 
-                     func.extract('year', Leave.end_date) == current_year)
-                ).all()
-                
-                leave_days = sum([l.days for l in leave_data])
+                working_days, overtime_hours = attendance_stats.get(employee.id, (0, 0.0))
+                leave_days = leave_totals.get(employee.id, 0)
                 
                 # Calculate salary based on working days and base salary
                 working_days_in_month = 22  # Approximate
-                base_salary = employee.base_salary
+                base_salary = employee.salary or 0.0
                 
                 # Calculate proportional salary if employee didn't work full month
                 effective_days = min(working_days + leave_days, working_days_in_month)
@@ -222,10 +213,7 @@ class PayrollAgent:
                     suggestions.append("High leave usage. May want to review scheduling.")
                 
                 # Check for salary anomalies
-                avg_salary = db.session.query(func.avg(Payroll.gross_salary)).filter(
-                    Payroll.employee_id == employee.id,
-                    Payroll.payment_status == 'paid'
-                ).scalar() or 0
+                avg_salary = avg_salaries.get(employee.id, 0)
                 
                 if abs(gross_salary - avg_salary) > 0.2 * avg_salary and avg_salary > 0:
                     suggestions.append(f"Salary deviation of {abs(gross_salary - avg_salary) / avg_salary:.1%} from average. Verify calculations.")
@@ -244,6 +232,75 @@ class PayrollAgent:
                 'message': f"Optimization failed: {str(e)}"
             }
     
+    @staticmethod
+    def _employee_scope(employee_ids):
+        """Employees covered by an optimization run, as an IN filter target"""
+        if employee_ids:
+            return list(employee_ids)
+        return db.session.query(Employee.id)
+
+    @classmethod
+    def attendance_totals_query(cls, employee_ids, month, year):
+        """Grouped (employee_id, working_days, overtime_hours) for the given month"""
+        return db.session.query(
+            Attendance.employee_id,
+            func.sum(case((Attendance.status.in_(['present', 'late']), 1), else_=0)).label('working_days'),
+            func.coalesce(func.sum(Attendance.overtime_hours), 0.0).label('overtime_hours')
+        ).filter(
+            Attendance.employee_id.in_(cls._employee_scope(employee_ids)),
+            within_period(Attendance.date, *month_bounds(year, month))
+        ).group_by(
+            Attendance.employee_id
+        )
+
+    @classmethod
+    def approved_leave_days_query(cls, employee_ids, month, year):
+        """Grouped (employee_id, leave_days) of approved leave touching the given month"""
+        return db.session.query(
+            Leave.employee_id,
+            func.coalesce(func.sum(Leave.days), 0).label('leave_days')
+        ).filter(
+            Leave.employee_id.in_(cls._employee_scope(employee_ids)),
+            Leave.status == 'approved',
+            overlaps_period(Leave.start_date, Leave.end_date, *month_bounds(year, month))
+        ).group_by(
+            Leave.employee_id
+        )
+
+    @classmethod
+    def average_paid_gross_query(cls, employee_ids):
+        """Grouped (employee_id, avg_gross) over paid payrolls"""
+        return db.session.query(
+            Payroll.employee_id,
+            func.avg(Payroll.gross_salary).label('avg_gross')
+        ).filter(
+            Payroll.employee_id.in_(cls._employee_scope(employee_ids)),
+            Payroll.payment_status == 'paid'
+        ).group_by(
+            Payroll.employee_id
+        )
+
+    def _attendance_totals(self, employee_ids, month, year):
+        """
+        Map employee id -> (working days, overtime hours) for the given month
+        """
+        rows = self.attendance_totals_query(employee_ids, month, year).all()
+        return {row.employee_id: (int(row.working_days or 0), float(row.overtime_hours)) for row in rows}
+
+    def _approved_leave_days(self, employee_ids, month, year):
+        """
+        Map employee id -> approved leave days touching the given month
+        """
+        rows = self.approved_leave_days_query(employee_ids, month, year).all()
+        return {row.employee_id: int(row.leave_days) for row in rows}
+
+    def _average_paid_gross(self, employee_ids):
+        """
+        Map employee id -> historical average gross salary of paid payrolls
+        """
+        rows = self.average_paid_gross_query(employee_ids).all()
+        return {row.employee_id: float(row.avg_gross or 0) for row in rows}
+    
     def process_natural_language_query(self, query):
         doc = self.nlp(query)
         
@@ -266,4 +323,52 @@ class PayrollAgent:
         else:
             result = "I'm not sure how to process that query. Can you rephrase?"
         
-        return result
\ No newline at end of file
+        return result
+
+# Benchmark: python -m agentic.agent
+if __name__ == "__main__":
+    import time
+    from datetime import date
+    from flask import Flask
+    from sqlalchemy import event
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        agent = PayrollAgent()
+        today = date.today()
+        seeded = 0
+        for headcount in (100, 1000, 10000):
+            db.session.bulk_insert_mappings(Employee, [
+                {'id': i, 'employee_id': i, 'first_name': 'Bench', 'last_name': str(i),
+                 'email': f'bench{i}@example.com', 'hire_date': today, 'position': 'Engineer',
+                 'department': 'Engineering', 'salary': 5000.0}
+                for i in range(seeded + 1, headcount + 1)
+            ])
+            db.session.bulk_insert_mappings(Attendance, [
+                {'employee_id': i, 'user_id': i, 'date': today.replace(day=d), 'status': 'present',
+                 'working_hours': 8.0, 'overtime_hours': 1.0}
+                for i in range(seeded + 1, headcount + 1) for d in range(1, min(today.day, 5) + 1)
+            ])
+            db.session.bulk_insert_mappings(Payroll, [
+                {'employee_id': i, 'basic_salary': 5000.0, 'gross_salary': 5200.0, 'net_salary': 4200.0,
+                 'payment_status': 'paid'}
+                for i in range(seeded + 1, headcount + 1)
+            ])
+            db.session.commit()
+            seeded = headcount
+
+            statements.clear()
+            start = time.perf_counter()
+            result = agent.optimize_payroll_process()
+            elapsed = time.perf_counter() - start
+            if result['status'] != 'success':
+                raise RuntimeError(f"optimize_payroll_process failed at {headcount} employees: {result}")
+            # The query count stays flat; wall time still grows with the rows fetched.
+            print(f"{headcount:>6} employees: {len(statements)} queries, {elapsed:.3f}s")
@@ -1,37 +1,110 @@
 import os
 import re
 import logging
-import numpy as np
-import pandas as pd
+import threading
+from functools import lru_cache
 from datetime import datetime, timedelta
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-
-# Try to download NLTK resources, handle offline scenarios
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-except Exception as e:
-    print(f"NLTK data download failed: {e}")
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# NLTK corpora are looked up here first and, if downloads are enabled, cached here
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA_DIR', os.path.join(os.path.dirname(__file__), 'nltk_data'))
+# Network downloads are opt-in so app and worker processes never block on them
+NLTK_ALLOW_DOWNLOAD = os.environ.get('NLTK_ALLOW_DOWNLOAD', 'False') == 'True'
+
+# Used when the NLTK stopwords corpus is unavailable
+FALLBACK_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves
+""".split())
+
+_FALLBACK_TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+
+_resources = {}
+_resources_lock = threading.Lock()
+
+
+def _nltk_resource(name, locators, loader):
+    """
+    Load an NLTK-backed resource once per process.
+
+    Looks for any of the locators (preferred first) in NLTK_DATA_DIR and
+    NLTK's default paths, downloads the first into NLTK_DATA_DIR only when
+    NLTK_ALLOW_DOWNLOAD is set, and returns None if the resource (or NLTK
+    itself) is unavailable so callers can fall back.
+    """
+    with _resources_lock:
+        if name in _resources:
+            return _resources[name]
+
+        resource = None
+        try:
+            import nltk
+            if NLTK_DATA_DIR not in nltk.data.path:
+                nltk.data.path.insert(0, NLTK_DATA_DIR)
+            if not any(_nltk_data_exists(nltk, locator) for locator in locators):
+                if not NLTK_ALLOW_DOWNLOAD:
+                    raise LookupError(locators[0])
+                nltk.download(locators[0].split('/')[-1], download_dir=NLTK_DATA_DIR, quiet=True)
+            resource = loader()
+        except Exception as e:
+            logger.info(f"NLTK resource '{name}' unavailable, using fallback ({type(e).__name__})")
+
+        _resources[name] = resource
+        return resource
+
+
+def _nltk_data_exists(nltk, locator):
+    try:
+        nltk.data.find(locator)
+        return True
+    except LookupError:
+        return False
+
+
+def get_stopwords():
+    def load():
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+    stop_words = _nltk_resource('stopwords', ('corpora/stopwords',), load)
+    return stop_words if stop_words is not None else FALLBACK_STOPWORDS
+
+
+def get_tokenizer():
+    def load():
+        from nltk.tokenize import word_tokenize
+        word_tokenize('warm up')  # fails here if punkt tables are missing
+        return word_tokenize
+    # nltk>=3.9 tokenizes with punkt_tab; older releases use the pickled punkt
+    tokenizer = _nltk_resource('punkt', ('tokenizers/punkt_tab', 'tokenizers/punkt'), load)
+    return tokenizer if tokenizer is not None else _FALLBACK_TOKEN_PATTERN.findall
+
+
+def get_lemmatizer():
+    def load():
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize('warmup')  # fails here if wordnet is missing
+        return lru_cache(maxsize=65536)(lemmatizer.lemmatize)
+    lemmatize = _nltk_resource('wordnet', ('corpora/wordnet',), load)
+    return lemmatize if lemmatize is not None else (lambda word: word)
+
+
 class NLPProcessor:
     """
     Natural Language Processing for interpreting payroll-related queries
     """
     def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
-        
-        # Try to get stopwords, handle case if NLTK data isn't available
-        try:
-            self.stop_words = set(stopwords.words('english'))
-        except:
-            self.stop_words = set()
+        # NLTK resources are resolved on first use, not at construction
+        self._tokenize = None
+        self._lemmatize = None
+        self._stop_words = None
         
         # Define intents and their keywords
         self.intent_keywords = {
@@ -60,14 +133,66 @@ class NLPProcessor:
             'comparison_period': r'(?:compare|comparison|vs|versus)\s+(\w+\s+\d{4})\s+(?:to|and|with)\s+(\w+\s+\d{4})'
         }
         
+        self._compile_matchers()
+    
+    def _compile_matchers(self):
+        """
+        Precompile the intent keyword matcher and entity regexes.
+        
+        All keywords go into one lookahead alternation (longest first), which
+        finds the longest keyword starting at every position of the text. Any
+        shorter keyword starting there is a prefix of it, so each keyword maps
+        to the set of keywords it implies, and the matched set is exactly the
+        keywords a per-keyword substring scan would find.
+        """
+        keywords = {keyword.lower() for words in self.intent_keywords.values() for keyword in words}
+        ordered = sorted(keywords, key=len, reverse=True)
+        self._keyword_pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in ordered) + '))')
+        self._keyword_prefixes = {
+            keyword: frozenset(k for k in keywords if keyword.startswith(k)) for keyword in keywords
+        }
+        self._intent_keyword_sets = [
+            (intent, frozenset(keyword.lower() for keyword in words))
+            for intent, words in self.intent_keywords.items()
+        ]
+        self._entity_regexes = [(entity, re.compile(pattern)) for entity, pattern in self.entity_patterns.items()]
+        
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            self._stop_words = get_stopwords()
+        return self._stop_words
+    
     def preprocess_text(self, text):
         """Preprocess text by tokenizing, removing stopwords and lemmatizing"""
+        if self._tokenize is None:
+            self._tokenize = get_tokenizer()
+            self._lemmatize = get_lemmatizer()
+        
         text = text.lower()
-        tokens = word_tokenize(text)
-        tokens = [self.lemmatizer.lemmatize(word) for word in tokens if word not in self.stop_words]
+        tokens = self._tokenize(text)
+        stop_words = self.stop_words
+        tokens = [self._lemmatize(word) for word in tokens if word not in stop_words]
         return tokens
     
-    def analyze_query(self, query_text):
+    def _match_keywords(self, text):
+        """Return the set of intent keywords that occur anywhere in text"""
+        found = set()
+        prefixes = self._keyword_prefixes
+        for match in self._keyword_pattern.finditer(text):
+            found |= prefixes[match.group(1)]
+        return found
+    
+    def _time_references(self, now):
+        return {
+            'last month': now - timedelta(days=30),
+            'last year': now.year - 1,
+            'this month': now.month,
+            'this year': now.year,
+            'previous quarter': (now.month - 1) // 3
+        }
+    
+    def analyze_query(self, query_text, now=None):
         """
         Analyze a natural language query to identify intent and entities
         """
@@ -75,34 +200,73 @@ class NLPProcessor:
             processed_tokens = self.preprocess_text(query_text)
             processed_text = ' '.join(processed_tokens)
             
-            intent_scores = {intent: sum(1 for keyword in keywords if keyword.lower() in processed_text)
-                             for intent, keywords in self.intent_keywords.items()}
+            found = self._match_keywords(processed_text)
+            intent_scores = {intent: len(words & found) for intent, words in self._intent_keyword_sets}
             
             intent = max(intent_scores, key=intent_scores.get) if any(intent_scores.values()) else 'unknown'
             
-            entities = {entity: re.findall(pattern, query_text) for entity, pattern in self.entity_patterns.items()}
-            entities = {k: v[0] if v else None for k, v in entities.items()}
+            entities = {}
+            for entity, regex in self._entity_regexes:
+                match = regex.search(query_text)
+                if match is None:
+                    entities[entity] = None
+                elif regex.groups == 1:
+                    entities[entity] = match.group(1)
+                else:
+                    entities[entity] = match.groups()
             
-            time_references = {
-                'last month': datetime.now() - timedelta(days=30),
-                'last year': datetime.now().year - 1,
-                'this month': datetime.now().month,
-                'this year': datetime.now().year,
-                'previous quarter': (datetime.now().month - 1) // 3
-            }
-            
-            for ref, value in time_references.items():
-                if ref in query_text.lower():
+            lowered = query_text.lower()
+            for ref, value in self._time_references(now or datetime.now()).items():
+                if ref in lowered:
                     entities[ref] = value
             
             return intent, entities
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             return 'error', {}
+    
+    def analyze_many(self, queries):
+        """
+        Analyze a batch of queries, returning a list of (intent, entities) tuples
+        """
+        now = datetime.now()
+        return [self.analyze_query(query, now) for query in queries]
 
 # Example Usage
 if __name__ == "__main__":
+    import subprocess
+    import sys
+
+    # Importing this module must not load NLTK or touch the network
+    probe = ("import sys, time; t = time.perf_counter(); import agentic.nlp_processor; "
+             "print(time.perf_counter() - t, 'nltk' in sys.modules)")
+    output = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.split()
+    import_seconds, nltk_loaded = float(output[0]), output[1] == 'True'
+    print(f"Import time: {import_seconds * 1000:.1f} ms (nltk loaded: {nltk_loaded})")
+    assert not nltk_loaded and import_seconds < 0.5
+
     nlp = NLPProcessor()
     query = "What was my salary in July 2023?"
     intent, entities = nlp.analyze_query(query)
     print(f"Intent: {intent}\nEntities: {entities}")
+
+    # Throughput over a realistic chatbot query mix
+    import time
+    corpus = [
+        "What was my salary in July 2023?",
+        "Show the tax deductions for employee id 4521 this year",
+        "How many days was John Smith absent last month?",
+        "Compare March 2023 to March 2024 payroll costs",
+        "When is the next payday in the payment schedule?",
+        "Give me a summary report of overtime for the engineering team",
+        "What is the total amount of bonus paid to staff in Q2?",
+        "Is my pension contribution 5% of my paycheck?",
+        "List employees with extra hours above 20 this month",
+        "Which department has the highest attendance rate?"
+    ] * 1000
+    nlp.analyze_many(corpus[:10])  # warm up lazy resources
+    start = time.perf_counter()
+    nlp.analyze_many(corpus)
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {len(corpus)} queries in {elapsed:.2f}s ({len(corpus) / elapsed:.0f} queries/sec)")
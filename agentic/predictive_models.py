@@ -1,6 +1,11 @@
 import pickle
 import os
+import glob
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+import joblib
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
@@ -11,14 +16,107 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_DIR = os.environ.get('AI_MODEL_PATH', 'agentic/models/')
+
+
+class SalaryModelStore:
+    """
+    Versioned on-disk store for trained salary models.
+
+    Artifacts are keyed by a fingerprint of the monthly aggregates they were
+    trained on, written with joblib and memory-mapped on load. The most
+    recently used models are kept per process (at most MAX_LOADED), and each
+    save prunes the directory down to the newest MAX_ARTIFACTS artifacts.
+    """
+    MAX_LOADED = 8
+    MAX_ARTIFACTS = 16
+
+    _loaded = OrderedDict()
+    _lock = threading.Lock()
+
+    FINGERPRINT_COLUMNS = ['month', 'avg_gross', 'avg_net']
+
+    def __init__(self, model_dir=None):
+        self.model_dir = model_dir or DEFAULT_MODEL_DIR
+
+    @classmethod
+    def fingerprint(cls, payroll_data):
+        """Stable hash of the training inputs (month, avg_gross, avg_net)"""
+        data = payroll_data[cls.FINGERPRINT_COLUMNS].copy()
+        data['month'] = pd.to_datetime(data['month'])
+        data = data.sort_values('month').reset_index(drop=True)
+        row_hashes = pd.util.hash_pandas_object(data, index=False).values
+        return hashlib.sha256(row_hashes.tobytes()).hexdigest()[:16]
+
+    def _artifact_path(self, fingerprint):
+        return os.path.join(self.model_dir, f"salary_{fingerprint}.joblib")
+
+    def load(self, fingerprint):
+        """Return {'gross', 'net'} models for a fingerprint, or None if never trained"""
+        key = (self.model_dir, fingerprint)
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+
+            path = self._artifact_path(fingerprint)
+            if not os.path.exists(path):
+                return None
+            try:
+                models = joblib.load(path, mmap_mode='r')
+            except Exception as e:
+                logger.error(f"Failed to load salary models from {path}: {str(e)}")
+                return None
+            self._remember(key, models)
+            logger.info(f"Loaded salary prediction models from {path}")
+            return models
+
+    def _remember(self, key, models):
+        """Cache loaded models, evicting the least recently used (caller holds _lock)"""
+        self._loaded[key] = models
+        self._loaded.move_to_end(key)
+        while len(self._loaded) > self.MAX_LOADED:
+            self._loaded.popitem(last=False)
+
+    def save(self, fingerprint, models):
+        key = (self.model_dir, fingerprint)
+        with self._lock:
+            self._remember(key, models)
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+            path = self._artifact_path(fingerprint)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(models, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"Saved salary prediction models to {path}")
+            self._prune_artifacts()
+        except Exception as e:
+            logger.error(f"Failed to save salary models: {str(e)}")
+
+    def _prune_artifacts(self):
+        """Delete all but the newest MAX_ARTIFACTS artifacts, superseded by later training"""
+        paths = sorted(glob.glob(os.path.join(self.model_dir, 'salary_*.joblib')), key=os.path.getmtime, reverse=True)
+        for path in paths[self.MAX_ARTIFACTS:]:
+            fingerprint = os.path.basename(path)[len('salary_'):-len('.joblib')]
+            with self._lock:
+                self._loaded.pop((self.model_dir, fingerprint), None)
+            try:
+                os.remove(path)
+                logger.info(f"Removed superseded salary models {path}")
+            except OSError as e:
+                logger.warning(f"Failed to remove {path}: {str(e)}")
+
+
 class SalaryPredictor:
     """
     Model to predict future salary trends based on historical data
     """
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, model_dir=None):
         self.model_path = model_path
         self.model = None
         self.scaler = None
+        self.model_store = SalaryModelStore(model_dir)
+        self.fingerprint = None
         self._initialize_model()
     
     def _initialize_model(self):
@@ -26,7 +124,13 @@ class SalaryPredictor:
         if self.model_path and os.path.exists(self.model_path):
             try:
                 with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
+                    saved = pickle.load(f)
+                if isinstance(saved, dict) and 'gross' in saved and 'net' in saved:
+                    self.model_gross = saved['gross']
+                    self.model_net = saved['net']
+                    self.fingerprint = saved.get('fingerprint')
+                else:
+                    self.model = saved
                 logger.info(f"Loaded salary prediction model from {self.model_path}")
             except Exception as e:
                 logger.error(f"Failed to load model: {str(e)}")
@@ -82,10 +186,14 @@ class SalaryPredictor:
             self.model_gross.fit(X, y_gross)
             self.model_net.fit(X, y_net)
             
+            self.fingerprint = SalaryModelStore.fingerprint(payroll_data)
+            self.model_store.save(self.fingerprint, {'gross': self.model_gross, 'net': self.model_net})
+            
             # Save model if path is specified
             if self.model_path:
                 with open(self.model_path, 'wb') as f:
-                    pickle.dump({'gross': self.model_gross, 'net': self.model_net}, f)
+                    pickle.dump({'gross': self.model_gross, 'net': self.model_net,
+                                 'fingerprint': self.fingerprint}, f)
                 logger.info(f"Saved salary prediction model to {self.model_path}")
                 
             return True
@@ -94,6 +202,20 @@ class SalaryPredictor:
             logger.error(f"Error training model: {str(e)}")
             return False
     
+    def _ensure_models(self, historic_data):
+        """Make model_gross/model_net match historic_data, loading or training as needed"""
+        fingerprint = SalaryModelStore.fingerprint(historic_data)
+        if fingerprint == self.fingerprint and hasattr(self, 'model_gross') and hasattr(self, 'model_net'):
+            return
+        
+        models = self.model_store.load(fingerprint)
+        if models is not None:
+            self.model_gross = models['gross']
+            self.model_net = models['net']
+            self.fingerprint = fingerprint
+        else:
+            self.train(historic_data)
+    
     def _extract_features(self, df):
         """Extract features from payroll data"""
         # Create time-based features
@@ -131,9 +253,8 @@ class SalaryPredictor:
             Dictionary with predictions
         """
         try:
-            # Train models if not already trained
-            if not hasattr(self, 'model_gross') or not hasattr(self, 'model_net'):
-                self.train(historic_data)
+            # Use the models trained on exactly this data, retraining only when it changed
+            self._ensure_models(historic_data)
             
             # Get latest data and prepare features for next month prediction
             df = historic_data.copy()
@@ -160,7 +281,7 @@ class SalaryPredictor:
             combined = combined.sort_values('month')
             
             # Extract features for the last row (prediction row)
-            X_pred = self._extract_features(combined).reshape(1, -1)
+            X_pred = self._extract_features(combined)[-1:]
             
             # Make predictions
             gross_pred = self.model_gross.predict(X_pred)[0]
@@ -233,30 +354,39 @@ class AttendancePredictor:
             
             # Analyze patterns by day of week
             if 'date' in attendance_data.columns:
-                attendance_data['day_of_week'] = pd.to_datetime(attendance_data['date']).dt.dayofweek
+                # Work on derived columns only; the caller's frame is left untouched
+                is_late = self._status_mask(attendance_data['status'], 'late')
+                frame = pd.DataFrame({
+                    'day_of_week': self._day_of_week(attendance_data['date']),
+                    'working_hours': attendance_data['working_hours'].to_numpy(),
+                    'late': is_late
+                })
                 
-                day_stats = attendance_data.groupby('day_of_week').agg({
-                    'working_hours': ['mean', 'std'],
-                    'status': lambda x: (x == 'late').mean() * 100  # Percentage of late arrivals
+                day_groups = frame.groupby('day_of_week')
+                day_stats = pd.DataFrame({
+                    ('working_hours', 'mean'): day_groups['working_hours'].mean(),
+                    ('working_hours', 'std'): day_groups['working_hours'].std(),
+                    ('status', 'late_percentage'): day_groups['late'].mean() * 100  # Percentage of late arrivals
                 })
                 
                 # Detect days with high late percentage
                 late_threshold = 20  # 20% late is considered high
-                high_late_days = day_stats['status'].loc[day_stats['status'] > late_threshold].index.tolist()
+                late_by_day = day_stats[('status', 'late_percentage')]
+                high_late_days = late_by_day.index[late_by_day > late_threshold].tolist()
                 
                 # Detect employees with attendance issues
                 if 'employee_id' in attendance_data.columns:
-                    employee_stats = attendance_data.groupby('employee_id').agg({
-                        'status': lambda x: (x == 'late').mean() * 100,  # Late %
-                        'working_hours': 'mean'
-                    })
+                    frame['employee_id'] = attendance_data['employee_id'].to_numpy()
+                    employee_groups = frame.groupby('employee_id')
+                    late_percentage = employee_groups['late'].mean() * 100  # Late %
+                    mean_hours = employee_groups['working_hours'].mean()
                     
                     # Employees with high late percentage
-                    late_employees = employee_stats.loc[employee_stats['status'] > late_threshold].index.tolist()
+                    late_employees = late_percentage.index[late_percentage > late_threshold].tolist()
                     
                     # Employees with low working hours
                     hours_threshold = 7.0  # 7 hours is considered low
-                    low_hours_employees = employee_stats.loc[employee_stats['working_hours'] < hours_threshold].index.tolist()
+                    low_hours_employees = mean_hours.index[mean_hours < hours_threshold].tolist()
                     
                     return {
                         'status': 'success',
@@ -290,11 +420,90 @@ class AttendancePredictor:
                 'message': f"Anomaly detection failed: {str(e)}"
             }
     
+    @staticmethod
+    def _status_mask(status, value):
+        """Boolean array of rows whose status equals value, compared on category codes"""
+        if not isinstance(status.dtype, pd.CategoricalDtype):
+            status = status.astype('category')
+        categories = status.cat.categories
+        if value not in categories:
+            return np.zeros(len(status), dtype=bool)
+        return status.cat.codes.to_numpy() == categories.get_loc(value)
+    
+    @staticmethod
+    def _day_of_week(dates):
+        """Day-of-week numbers (Monday=0) as a compact int8 array"""
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+        return dates.dt.dayofweek.to_numpy(dtype=np.int8)
+    
     def _day_name(self, day_number):
         """Convert day number to name"""
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         return days[int(day_number)]
     
+    def predict_future_attendance_many(self, historical_data, days=30, workers=None, as_frame=False):
+        """
+        Predict future attendance for every employee in historical_data at once
+        
+        Args:
+            historical_data: DataFrame with employee_id, date, working_hours and status
+            days: Number of days to predict
+            workers: If > 1, split employees into shards across a process pool
+            as_frame: Return predictions as one long DataFrame instead of
+                per-employee record lists
+        
+        Returns:
+            Dictionary with predictions per employee (same records as
+            predict_future_attendance) and the ids lacking enough history
+        """
+        try:
+            data = historical_data[['employee_id', 'date', 'working_hours', 'status']]
+            data = data.assign(date=pd.to_datetime(data['date']))
+            data = data.sort_values('employee_id', kind='stable').reset_index(drop=True)
+            
+            if workers and workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                
+                # Shard on employee boundaries so each worker sees whole histories
+                ids = data['employee_id'].to_numpy()
+                unique_ids, starts = np.unique(ids, return_index=True)
+                bounds = [starts[k] for k in np.linspace(0, len(unique_ids), workers + 1, dtype=int)[1:-1]]
+                edges = [0] + list(bounds) + [len(data)]
+                shards = [data.iloc[edges[k]:edges[k + 1]] for k in range(len(edges) - 1)
+                          if edges[k + 1] > edges[k]]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(_forecast_attendance_block, shards, [days] * len(shards)))
+            else:
+                results = [_forecast_attendance_block(data, days)]
+            
+            frames = [frame for frame, _ in results if not frame.empty]
+            predictions = pd.concat(frames, ignore_index=True) if frames else results[0][0]
+            insufficient = [employee_id for _, ids in results for employee_id in ids]
+            
+            if not as_frame:
+                # Rows come out grouped by employee, `days` consecutive rows each
+                columns = ['date', 'predicted_hours', 'present_probability', 'predicted_status']
+                records = predictions[columns].to_dict('records')
+                employee_ids = predictions['employee_id'].to_numpy()[::days]
+                predictions = {
+                    employee_id: records[k * days:(k + 1) * days]
+                    for k, employee_id in enumerate(employee_ids.tolist())
+                }
+            
+            return {
+                'status': 'success',
+                'predictions': predictions,
+                'insufficient_history': insufficient
+            }
+            
+        except Exception as e:
+            logger.error(f"Error predicting future attendance: {str(e)}")
+            return {
+                'status': 'error',
+                'message': f"Prediction failed: {str(e)}"
+            }
+    
     def predict_future_attendance(self, employee_id, historical_data, days=30):
         """
         Predict future attendance patterns for an employee
@@ -390,4 +599,123 @@ class AttendancePredictor:
             return {
                 'status': 'error',
                 'message': f"Prediction failed: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+
+ATTENDANCE_FEATURES = 10  # day_of_week, month, day, dow_0..dow_6
+MIN_ATTENDANCE_HISTORY = 30
+
+
+def _attendance_feature_matrix(dates):
+    """Feature rows used by the attendance regressions, one per date"""
+    dates = pd.DatetimeIndex(dates)
+    day_of_week = dates.dayofweek.to_numpy()
+    # Column-major so the per-feature passes below read contiguous memory
+    X = np.empty((len(dates), ATTENDANCE_FEATURES), dtype=np.float64, order='F')
+    X[:, 0] = day_of_week
+    X[:, 1] = dates.month.to_numpy()
+    X[:, 2] = dates.day.to_numpy()
+    X[:, 3:] = day_of_week[:, None] == np.arange(7)
+    return X
+
+
+def _forecast_attendance_block(block, days):
+    """
+    Forecast every employee in an employee-sorted block of attendance rows.
+
+    Fits the same per-employee linear model as predict_future_attendance,
+    for all employees at once: features are centred per employee and the
+    centred normal equations of every employee are solved in one batched
+    pseudo-inverse, which gives the same minimum-norm solution as
+    LinearRegression's least-squares fit.
+
+    Returns (predictions DataFrame, ids with too little history).
+    """
+    ids = block['employee_id'].to_numpy()
+    unique_ids, starts, counts = np.unique(ids, return_index=True, return_counts=True)
+
+    enough = counts >= MIN_ATTENDANCE_HISTORY
+    insufficient = unique_ids[~enough].tolist()
+    if not enough.any():
+        return pd.DataFrame(columns=['employee_id', 'date', 'predicted_hours',
+                                     'present_probability', 'predicted_status']), insufficient
+    if not enough.all():
+        block = block[np.repeat(enough, counts)]
+        unique_ids, counts = unique_ids[enough], counts[enough]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    n_employees = len(unique_ids)
+    dates = pd.DatetimeIndex(block['date'])
+    X = _attendance_feature_matrix(dates)
+    y = block['working_hours'].to_numpy(dtype=np.float64)
+    present = AttendancePredictor._status_mask(block['status'], 'present')
+
+    # Centre features and targets per employee, column by column to bound memory
+    x_mean = np.add.reduceat(X, starts, axis=0) / counts[:, None]
+    y_mean = np.add.reduceat(y, starts) / counts
+    for i in range(ATTENDANCE_FEATURES):
+        X[:, i] -= np.repeat(x_mean[:, i], counts)
+    y = y - np.repeat(y_mean, counts)
+
+    XtX = np.empty((n_employees, ATTENDANCE_FEATURES, ATTENDANCE_FEATURES))
+    for i in range(ATTENDANCE_FEATURES):
+        for j in range(i, ATTENDANCE_FEATURES):
+            XtX[:, i, j] = XtX[:, j, i] = np.add.reduceat(X[:, i] * X[:, j], starts)
+    Xty = np.stack([np.add.reduceat(X[:, i] * y, starts) for i in range(ATTENDANCE_FEATURES)], axis=1)
+
+    coef = np.einsum('eij,ej->ei', np.linalg.pinv(XtX, rcond=1e-10, hermitian=True), Xty)
+    intercept = y_mean - np.einsum('ei,ei->e', x_mean, coef)
+
+    # Presence rate per employee and day of week
+    employee_index = np.repeat(np.arange(n_employees), counts)
+    slot = employee_index * 7 + dates.dayofweek.to_numpy()
+    seen = np.bincount(slot, minlength=n_employees * 7)
+    present_count = np.bincount(slot, weights=present, minlength=n_employees * 7)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        present_rate = (present_count / seen).reshape(n_employees, 7)
+    present_rate = np.where(seen.reshape(n_employees, 7) > 0, present_rate, 0.9)
+
+    # Future calendar: `days` dates after each employee's last record
+    last_dates = np.maximum.reduceat(dates.to_numpy(), starts)
+    future_dates = (last_dates[:, None] + np.arange(1, days + 1) * np.timedelta64(1, 'D')).ravel()
+    X_future = _attendance_feature_matrix(future_dates).reshape(n_employees, days, ATTENDANCE_FEATURES)
+    predicted_hours = intercept[:, None] + np.einsum('edk,ek->ed', X_future, coef)
+
+    future_dow = X_future[:, :, 0].astype(np.int64)
+    probability = np.take_along_axis(present_rate, future_dow, axis=1)
+
+    predicted_status = np.select(
+        [future_dow >= 5, probability < 0.7, probability < 0.9],
+        ['weekend', 'likely_absent', 'may_be_late'],
+        default='likely_present'
+    )
+
+    predictions = pd.DataFrame({
+        'employee_id': np.repeat(unique_ids, days),
+        'date': future_dates,
+        'predicted_hours': predicted_hours.ravel(),
+        'present_probability': probability.ravel(),
+        'predicted_status': predicted_status.ravel()
+    })
+    return predictions, insufficient
+
+
+# Benchmark: python -m agentic.predictive_models
+if __name__ == "__main__":
+    import time
+
+    rows = 10_000_000
+    rng = np.random.default_rng(42)
+    attendance = pd.DataFrame({
+        'employee_id': rng.integers(1, 20001, rows, dtype=np.int32),
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'status': pd.Categorical.from_codes(rng.choice(3, rows, p=[0.8, 0.15, 0.05]),
+                                            categories=['present', 'late', 'absent']),
+        'working_hours': rng.normal(8, 1, rows)
+    })
+
+    start = time.perf_counter()
+    result = AttendancePredictor().detect_anomalies(attendance)
+    elapsed = time.perf_counter() - start
+    print(f"detect_anomalies over {rows:,} rows: {elapsed:.2f}s "
+          f"({len(result['employee_anomalies']['late_employees'])} late employees flagged)")
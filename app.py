@@ -91,22 +91,54 @@ def create_app():
     def index():
         return redirect(url_for('auth.login'))
 
+    # Background tasks enqueue through the app-configured Celery instance
+    create_celery(app)
+
+    @app.cli.command('rebuild-payroll-rollups')
+    def rebuild_payroll_rollups():
+        """Backfill or repair the monthly payroll rollup from the payrolls table."""
+        from models.payroll import PayrollMonthlyRollup
+        print(f"Rebuilt {PayrollMonthlyRollup.rebuild()} payroll rollup rows")
+
+    @app.cli.command('prune-report-artifacts')
+    def prune_report_artifacts():
+        """Delete stored report PDF/CSV files that no payroll report refers to."""
+        import click
+        from models.payroll import PayrollReportBuild
+        from services.payroll_reports import prune_artifacts
+        # A running build writes its artifacts before the report rows commit
+        if PayrollReportBuild.query.filter(PayrollReportBuild.status.in_(('pending', 'running'))).first():
+            raise click.ClickException("Payroll report builds are in progress; try again once they finish")
+        print(f"Removed {prune_artifacts()} unreferenced report artifacts")
+
     # Flask-Login User Loader
+    # Flask-Login resolves the session to a cached, detached principal, so
+    # authenticated requests do not query the user table just for identity
+    from services.user_principal import get_user_principal
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return get_user_principal(int(user_id), app.config.get('USER_CACHE_TTL'))
 
     return app
 
 def create_celery(app=None):
-    """Create a Celery instance for background tasks."""
+    """
+    Configure the shared Celery instance for background tasks.
+
+    Tasks are declared with @shared_task (see services/pay_run.py) and bind to
+    this instance, so the web process can enqueue them and workers started
+    with `celery -A celery_worker.celery worker` can run them.
+    """
     app = app or create_app()
-    celery = Celery(
-        app.import_name,
-        backend=app.config.get('CELERY_RESULT_BACKEND'),
-        broker=app.config.get('CELERY_BROKER_URL')
+    celery.main = app.import_name
+    # Map the Flask settings explicitly: Celery rejects its old uppercase
+    # setting names when they are mixed with the new lowercase ones
+    celery.conf.update(
+        broker_url=app.config.get('CELERY_BROKER_URL'),
+        result_backend=app.config.get('CELERY_RESULT_BACKEND'),
+        task_always_eager=app.config.get('CELERY_TASK_ALWAYS_EAGER', False)
     )
-    celery.conf.update(app.config)
 
     class ContextTask(celery.Task):
         """Ensure Celery tasks have Flask app context."""
@@ -119,6 +151,5 @@ def create_celery(app=None):
 
 if __name__ == '__main__':
     app = create_app()
-    celery = create_celery(app)  # Initialize Celery globally
 
     app.run(host='0.0.0.0', port=5000, debug=app.config.get('DEBUG', False))
\ No newline at end of file
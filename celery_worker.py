@@ -0,0 +1,15 @@
+"""
+Celery worker entry point.
+
+    celery -A celery_worker.celery worker --loglevel=info
+
+For local development without a broker, set CELERY_TASK_ALWAYS_EAGER=True
+(or use TestingConfig, which also selects the in-memory broker) and tasks run
+inline in the web process instead.
+"""
+from app import create_app, create_celery
+
+app = create_app()
+celery = create_celery(app)
+
+import services.pay_run  # noqa: E402,F401  (registers the pay-run tasks)
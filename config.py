@@ -35,6 +35,21 @@ class Config:
     # 🔄 Celery (Background Tasks)
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
+    # Run tasks inline in the calling process (local development without a worker)
+    CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+    PAY_RUN_BATCH_SIZE = int(os.environ.get('PAY_RUN_BATCH_SIZE', 500))
+
+    # 📊 Admin dashboard statistics cache (seconds)
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 30))
+
+    # 👤 Cached login principals (seconds before a changed role is seen by other workers)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+
+    # 🔑 Password hashing (raising the cost rehashes each user's password at their next login)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 256))
+    PASSWORD_HASH_NICE = int(os.environ.get('PASSWORD_HASH_NICE', 10))
 
     # 🧠 AI Model Configurations
     AI_MODEL_PATH = os.environ.get('AI_MODEL_PATH', 'agentic/models/')
@@ -67,6 +82,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # Use in-memory DB for faster tests
     WTF_CSRF_ENABLED = False
+    CELERY_BROKER_URL = 'memory://'
+    CELERY_RESULT_BACKEND = 'cache+memory://'
+    CELERY_TASK_ALWAYS_EAGER = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Fast hashing for tests
     PRESERVE_CONTEXT_ON_EXCEPTION = False
 
 
@@ -1,13 +1,14 @@
 #payroll_system/admin_controller.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from models.user import User
-from models.employee import Employee
 from models.payroll import Payroll
 from models.attendance import Attendance
-from models.leave import Leave
-from services.email_service import EmailService as send_email
+from services.pay_run import notify_payroll_approved
+from services.password_hasher import get_password_hasher
+from services.user_principal import get_principal_cache_stats, invalidate_user
+from services.dashboard_stats import get_dashboard_counts, get_cache_stats
 from app import db
 
 # Blueprint for admin functionalities
@@ -21,12 +22,9 @@ def dashboard():
         flash("Unauthorized access!", "danger")
         return redirect(url_for('auth.login'))
     
-    employees = Employee.query.count()
-    payrolls = Payroll.query.count()
-    leaves = Leave.query.count()
-    users = User.query.count()
+    counts = get_dashboard_counts(current_app.config.get('STATS_CACHE_TTL'))
     
-    return render_template('dashboard/admin_dashboard.html', employees=employees, payrolls=payrolls, leaves=leaves, users=users)
+    return render_template('dashboard/admin_dashboard.html', **counts)
 
 # Manage users
 @admin_bp.route('/users')
@@ -53,6 +51,7 @@ def update_user_role(user_id):
     if new_role in ["admin", "employee", "manager"]:
         user.role = new_role
         db.session.commit()
+        invalidate_user(user.id)
         flash(f"Role updated to {new_role} for {user.username}", "success")
     else:
         flash("Invalid role!", "danger")
@@ -70,6 +69,7 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_user(user_id)
     flash("User deleted successfully!", "success")
 
     return redirect(url_for('admin.manage_users'))
@@ -83,16 +83,11 @@ def approve_payroll(payroll_id):
         return redirect(url_for('auth.login'))
 
     payroll = Payroll.query.get_or_404(payroll_id)
-    payroll.status = "Approved"
+    payroll.payment_status = 'approved'
     db.session.commit()
     
-    # Notify employee
-    employee = Employee.query.get(payroll.employee_id)
-    send_email(
-        subject="Payroll Approved",
-        recipient=employee.email,
-        body=f"Dear {employee.name}, your payroll for {payroll.month} has been approved."
-    )
+    # Notify employee in the background
+    notify_payroll_approved.delay(payroll.id)
 
     flash("Payroll approved successfully!", "success")
     return redirect(url_for('admin.dashboard'))
@@ -119,10 +114,32 @@ def get_statistics():
     if not current_user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
-    stats = {
-        "employees": Employee.query.count(),
-        "payrolls": Payroll.query.count(),
-        "leaves": Leave.query.count(),
-        "users": User.query.count()
-    }
+    stats = get_dashboard_counts(current_app.config.get('STATS_CACHE_TTL'))
     return jsonify(stats)
+
+# Stats cache hit/miss counters (API endpoint)
+@admin_bp.route('/api/stats/cache', methods=['GET'])
+@login_required
+def get_statistics_cache():
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify(get_cache_stats())
+
+# Cached login principal counters (API endpoint)
+@admin_bp.route('/api/users/cache', methods=['GET'])
+@login_required
+def get_user_cache():
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify(get_principal_cache_stats())
+
+# Password hashing pool queue depth and timings (API endpoint)
+@admin_bp.route('/api/auth/hash-pool', methods=['GET'])
+@login_required
+def get_hash_pool_stats():
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify(get_password_hasher().stats())
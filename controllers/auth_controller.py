@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from models.user import User
+from services.password_hasher import get_password_hasher, HashPoolBusy
 from services.email_service import EmailService as send_email
 from forms.auth_forms import RegistrationForm, LoginForm, ResetPasswordForm  
 from app import db
@@ -11,7 +11,6 @@ from auth.oauth import google_bp  # ✅ Correct import
 
 # Blueprint for authentication
 from flask import Blueprint, render_template, request, redirect, url_for, flash
-from werkzeug.security import generate_password_hash
 from flask_mail import Message
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired
 from models import User
@@ -57,10 +56,13 @@ def register():
         if User.query.filter_by(username=username).first():
             return jsonify({"success": False, "message": "This username is already taken."}), 400
 
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256', salt_length=16)
+        try:
+            hashed_password = get_password_hasher().hash(password)
+        except HashPoolBusy:
+            return jsonify({"success": False, "message": "The server is busy, please try again."}), 503
 
         new_user = User(
-            email=email, username=username, password=hashed_password,
+            email=email, username=username, password_hash=hashed_password,
             role="user", accepted_terms=True, is_enabled=False
         )
         db.session.add(new_user)
@@ -103,7 +105,19 @@ def login():
         password = form.password.data
         user = User.query.filter_by(email=email).first()
 
-        if user and check_password_hash(user.password, password):
+        hasher = get_password_hasher()
+        try:
+            # Unknown emails are checked against a dummy hash, so they take as long as real accounts
+            valid, new_hash = hasher.verify_and_update(user.password_hash if user else None, password)
+        except HashPoolBusy:
+            flash("The server is busy, please try again in a moment.", "warning")
+            return render_template('auth/login.html', form=form), 503
+
+        if user and valid:
+            # Stored with an outdated method or cost; upgrade it while we have the plaintext
+            if new_hash:
+                user.password_hash = new_hash
+                db.session.commit()
             login_user(user)
             flash("Login successful!", "success")
 
@@ -161,7 +175,11 @@ def reset_password_token(token):
 
     if request.method == 'POST':
         new_password = request.form.get('password')
-        user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+        try:
+            user.password_hash = get_password_hasher().hash(new_password)
+        except HashPoolBusy:
+            flash("The server is busy, please try again in a moment.", "warning")
+            return render_template('auth/reset_password_token.html'), 503
         db.session.commit()
 
         flash("Password reset successfully! You can now log in.", "success")
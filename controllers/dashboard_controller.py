@@ -1,14 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, jsonify, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from models.employee import Employee
 from models.user import User
-from models.payroll import Payroll
-from models.attendance import Attendance
 from models.company import Company
 from models.department import Department
-from models.leave import Leave
 
 from app import db
+from services.user_principal import invalidate_user
+from services.dashboard_data import COMPANY_SEARCH_PAGE_SIZE, load_user_dashboard, search_companies
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
@@ -19,22 +18,26 @@ def dashboard():
         flash("Unauthorized access!", "danger")
         return redirect(url_for('auth.login'))
 
-    payrolls = Payroll.query.filter_by(user_id=current_user.id).all()
-    attendance_records = Attendance.query.filter_by(user_id=current_user.id).all()
-    employee = Employee.query.filter_by(user_id=current_user.id).first()
-    leave = Leave.query.filter_by(user_id=current_user.id).first()
-
-    
-    # Fetch all companies for search feature
-    companies = Company.query.all()
+    data = load_user_dashboard(current_user.id)
 
     return render_template(
         'dashboard/index.html', 
-        payrolls=payrolls, 
-        attendance_records=attendance_records, 
-        employee=employee,
-        companies=companies, leave=leave
+        payrolls=data['payrolls'], 
+        attendance_records=data['attendance_records'], 
+        employee=data['employee'],
+        leave=data['leave']
+    )
+
+# Company search for the dashboard search box, one page per request
+@dashboard_bp.route('/api/companies', methods=['GET'])
+@login_required
+def search_company_names():
+    companies, next_after = search_companies(
+        prefix=request.args.get('q', '').strip(),
+        after_name=request.args.get('after'),
+        limit=request.args.get('limit', COMPANY_SEARCH_PAGE_SIZE, type=int)
     )
+    return jsonify({'companies': companies, 'next_after': next_after})
 
 @dashboard_bp.route('/create_company', methods=['POST'])
 @login_required
@@ -52,9 +55,10 @@ def create_company():
     db.session.add(new_company)
     db.session.commit()
 
-    # Assign user as Admin
-    current_user.role = "Admin"
+    # Assign user as Admin (current_user is a cached principal, so update the row)
+    User.query.filter_by(id=current_user.id).update({'role': "Admin"})
     db.session.commit()
+    invalidate_user(current_user.id)
 
     flash("Company created successfully! You are now the admin.", "success")
     return redirect(url_for('dashboard.dashboard'))
@@ -78,6 +82,7 @@ def join_company(company_id):
     new_employee = Employee(user_id=current_user.id, company_id=company_id)
     db.session.add(new_employee)
     db.session.commit()
+    invalidate_user(current_user.id)
 
     flash(f"You have joined {company.name} successfully!", "success")
     return redirect(url_for('dashboard.dashboard'))
@@ -100,10 +105,11 @@ def remove_employee(user_id):
         flash("Access Denied!", "danger")
         return redirect(url_for('dashboard.dashboard'))
 
-    employee = Employee.query.filter_by(user_id=user_id, company_id=current_user.company.id).first()
+    employee = Employee.query.filter_by(user_id=user_id, company_id=current_user.company_id).first()
     if employee:
         db.session.delete(employee)
         db.session.commit()
+        invalidate_user(user_id)
         flash("Employee removed successfully!", "success")
     else:
         flash("Employee not found!", "danger")
@@ -1,11 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, Response, render_template, request, redirect, stream_with_context, url_for, flash
 from flask_login import current_user, login_required
 from app import db
 from sqlalchemy.exc import SQLAlchemyError
 
-from models.attendance import Attendance
 from models.employee import Employee
-from models.payroll import Payroll
+from services.dashboard_data import load_user_dashboard
+from services.employee_directory import DEFAULT_PAGE_SIZE, employee_page, stream_employee_page_json
 
 # Create Blueprint
 employee_bp = Blueprint('employee', __name__)
@@ -21,23 +21,37 @@ def employee_dashboard():
         return redirect(url_for('auth.login'))
 
     # Fetch records specific to the logged-in employee
-    payrolls = Payroll.query.filter_by(user_id=current_user.id).all()
-    attendance_records = Attendance.query.filter_by(user_id=current_user.id).all()
-    employee = Employee.query.filter_by(user_id=current_user.id).first()
+    data = load_user_dashboard(current_user.id)
 
     return render_template(
         'dashboard/employee_dashboard.html', 
-        payrolls=payrolls, 
-        attendance_records=attendance_records, 
-        employee=employee
+        payrolls=data['payrolls'], 
+        attendance_records=data['attendance_records'], 
+        employee=data['employee']
     )
 
 # List all employees
 @employee_bp.route('/employees')
 @login_required
 def list_employees():
-    employees = Employee.query.all()
-    return render_template('employee/list.html', employees=employees)
+    search = request.args.get('q', '').strip() or None
+    employees, next_after = employee_page(
+        after_id=request.args.get('after', type=int),
+        limit=request.args.get('limit', DEFAULT_PAGE_SIZE),
+        search=search
+    )
+    return render_template('employee/list.html', employees=employees, next_after=next_after, search=search)
+
+# Employee list as JSON, one page per request (for infinite scroll)
+@employee_bp.route('/employees.json')
+@login_required
+def list_employees_json():
+    body = stream_employee_page_json(
+        after_id=request.args.get('after', type=int),
+        limit=request.args.get('limit', DEFAULT_PAGE_SIZE),
+        search=request.args.get('q', '').strip() or None
+    )
+    return Response(stream_with_context(body), mimetype='application/json')
 
 # Add new employee
 @employee_bp.route('/employees/add', methods=['GET', 'POST'])
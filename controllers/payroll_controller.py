@@ -1,69 +1,89 @@
-from flask import Blueprint, jsonify, render_template, request, flash, redirect, send_file, url_for
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, flash, redirect, stream_with_context, url_for
 from flask_login import login_required, current_user
 import datetime
-import pandas as pd
-from flask import send_file
 from models.payroll import Payroll
+from services.payroll_export import stream_payroll_csv, stream_payroll_parquet, parquet_available
+from services.payroll_import import PAYMENT_STATUSES, import_payrolls, iter_ndjson
+from services.payroll_search import DEFAULT_PAGE_SIZE, get_payroll_details, row_dict, search_payrolls
+from services.pay_run import DEFAULT_BATCH_SIZE, create_pay_run, plan_pay_run
 
 # Assuming you have database models for payroll data, employees, etc.
-from models import Payroll, Employee
+from models import Payroll, Employee, PayRun
 from app import db
 
 payroll_bp = Blueprint('payroll', __name__)
 
+def _search_args(values):
+    """
+    Parse payroll search criteria from a form or query string.
+    Users other than admins and HR only ever see their own payrolls.
+    """
+    def optional_int(name):
+        value = (values.get(name) or '').strip()
+        return int(value) if value else None
+
+    def optional_date(name):
+        value = values.get(name)
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+    employee_id = optional_int('employee_id')
+    if not (current_user.is_admin or current_user.is_hr):
+        # No employee record means no payrolls; -1 matches nothing
+        employee_id = current_user.employee_id if current_user.employee_id is not None else -1
+    return {
+        'employee_id': employee_id,
+        'company_id': optional_int('company_id'),
+        'status': values.get('status') or None,
+        'start_date': optional_date('start_date'),
+        'end_date': optional_date('end_date')
+    }
+
 @payroll_bp.route('/payroll', methods=['GET', 'POST'])
 @login_required
 def payroll_home():
     payroll_data = []
+    next_after = None
+    criteria = {}
 
-    if request.method == 'POST':
-        employee_id = request.form.get('employee_id')
-        start_date_str = request.form.get('start_date')
-        end_date_str = request.form.get('end_date')
-
+    if request.method == 'POST' or request.args:
         try:
-            start_date = datetime.datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
-            end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
-
-            # Fetch payroll data based on criteria
-            
-            if employee_id and start_date and end_date:
-                payroll_data = Payroll.query.filter(Payroll.employee_id == employee_id,Payroll.pay_date >= start_date,Payroll.pay_date <= end_date).all()
-            
-            if employee_id and start_date and end_date:
-                payroll_data = [
-                    {'payroll_id': 1, 'employee_id': employee_id, 'pay_date': start_date, 'gross_pay': 5000, 'net_pay': 4000},
-                    {'payroll_id': 2, 'employee_id': employee_id, 'pay_date': end_date, 'gross_pay': 5200, 'net_pay': 4200}
-                ]
-            elif employee_id:
-                payroll_data = [
-                    {'payroll_id': 3, 'employee_id': employee_id, 'pay_date': datetime.date(2023, 1, 15), 'gross_pay': 4800, 'net_pay': 3800}
-                ]
+            criteria = _search_args(request.values)
+            payroll_data, next_after = search_payrolls(after=request.args.get('after'), **criteria)
 
             if not payroll_data:
                 flash('No payroll data found for the given criteria.', 'info')
 
-        except ValueError:
-            flash('Invalid date format. Please use YYYY-MM-DD.', 'error')
+        except ValueError as e:
+            flash(f'Invalid search: {e}. Dates use YYYY-MM-DD.', 'error')
 
-    return render_template('payroll.html', payroll_data=payroll_data)
+    # Criteria go back into the "Next page" link as query arguments
+    next_args = {key: value for key, value in criteria.items() if value is not None}
+    return render_template('payroll/payroll.html', payroll_data=payroll_data, next_after=next_after,
+                           next_args=next_args, statuses=PAYMENT_STATUSES)
+
+# Search payrolls (API endpoint), keyset-paginated with ?after=<next_after>
+@payroll_bp.route('/payroll/api/search', methods=['GET'])
+@login_required
+def payroll_search_api():
+    try:
+        rows, next_after = search_payrolls(
+            after=request.args.get('after'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE),
+            **_search_args(request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'payrolls': [row_dict(row) for row in rows], 'next_after': next_after})
 
 @payroll_bp.route('/payroll/details/<int:payroll_id>')
 @login_required
 def payroll_details(payroll_id):
-    # Fetch detailed payroll information
-    payroll = Payroll.query.get_or_404(payroll_id)
-    payroll = next((p for p in [
-        {'payroll_id': 1, 'employee_id': '123', 'pay_date': datetime.date(2023, 1, 1), 'gross_pay': 5000, 'net_pay': 4000, 'deductions': [{'type': 'tax', 'amount': 500}, {'type': 'insurance', 'amount': 500}]},
-        {'payroll_id': 2, 'employee_id': '123', 'pay_date': datetime.date(2023, 2, 1), 'gross_pay': 5200, 'net_pay': 4200, 'deductions': [{'type': 'tax', 'amount': 520}, {'type': 'insurance', 'amount': 480}]},
-        {'payroll_id': 3, 'employee_id': '456', 'pay_date': datetime.date(2023, 1, 15), 'gross_pay': 4800, 'net_pay': 3800, 'deductions': [{'type': 'tax', 'amount': 480}, {'type': 'insurance', 'amount': 520}]}
-    ] if p['payroll_id'] == payroll_id), None)
-
-    if payroll:
-        return render_template('payroll_details.html', payroll=payroll)
+    payroll = get_payroll_details(payroll_id)
+    if payroll and (current_user.is_admin or current_user.is_hr or payroll.employee_id == current_user.employee_id):
+        return render_template('payroll/payroll_details.html', payroll=payroll)
     else:
         flash('Payroll details not found.', 'error')
-        return redirect(url_for('payroll.payroll'))
+        return redirect(url_for('payroll.payroll_home'))
 
 @payroll_bp.route('/generate', methods=['POST'])
 @login_required
@@ -89,12 +109,108 @@ def generate_payroll():
 
     return jsonify({'message': 'Payroll generated successfully', 'payroll_id': payroll.id}), 201
 
+@payroll_bp.route('/payroll/bulk', methods=['POST'])
+@login_required
+def bulk_create_payrolls():
+    """
+    Insert many payrolls in one request: a JSON list (or {"payrolls": [...]}),
+    or an NDJSON body (Content-Type: application/x-ndjson) read line by line.
+
+    Invalid rows are reported by index and skipped. The response is 201 when
+    every row was inserted, 207 when some were, and 400 when none were.
+    """
+    if not current_user.is_admin:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        entries = iter_ndjson(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        entries = data.get('payrolls') if isinstance(data, dict) else data
+        if not isinstance(entries, list):
+            return jsonify({'error': 'Expected a JSON list of payrolls or an NDJSON body'}), 400
+
+    result = import_payrolls(entries)
+    if not result['failed']:
+        status = 201
+    elif result['inserted']:
+        status = 207
+    else:
+        status = 400
+    return jsonify(result), status
+
+@payroll_bp.route('/payroll/runs', methods=['POST'])
+@login_required
+def start_pay_run():
+    """
+    Start an asynchronous pay run and return its status (202) right away.
+
+    JSON body: period_start, period_end (inclusive, YYYY-MM-DD) and optionally
+    payment_date, company_id, batch_size, render_payslips, send_notifications.
+    """
+    if not current_user.is_admin:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        period_start = datetime.date.fromisoformat(data['period_start'])
+        period_end = datetime.date.fromisoformat(data['period_end'])
+        payment_date = datetime.date.fromisoformat(data['payment_date']) if data.get('payment_date') else None
+        run = create_pay_run(
+            period_start, period_end, payment_date,
+            company_id=data.get('company_id'),
+            batch_size=int(data.get('batch_size', current_app.config.get('PAY_RUN_BATCH_SIZE', DEFAULT_BATCH_SIZE))),
+            render_payslips=bool(data.get('render_payslips', True)),
+            send_notifications=bool(data.get('send_notifications', True)),
+            created_by=current_user.id
+        )
+    except KeyError as e:
+        return jsonify({'error': f'Missing field: {e.args[0]}'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    plan_pay_run.delay(run.id)
+    db.session.refresh(run)  # reflects progress already made when tasks run eagerly
+
+    response = jsonify(run.to_dict())
+    response.headers['Location'] = url_for('payroll.pay_run_status', run_id=run.id)
+    return response, 202
+
+@payroll_bp.route('/payroll/runs/<int:run_id>', methods=['GET'])
+@login_required
+def pay_run_status(run_id):
+    if not current_user.is_admin:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    run = PayRun.query.get_or_404(run_id)
+    return jsonify(run.to_dict())
+
 @payroll_bp.route('/export', methods=['GET'])
 def export_payroll():
-    payrolls = Payroll.query.all()
-    data = [{'Employee ID': p.employee_id, 'Pay Period': p.pay_period, 'Amount': p.amount, 'Bonus': p.bonuses, 'Approved': p.approved} for p in payrolls]
-
-    df = pd.DataFrame(data)
-    df.to_csv('payroll_export.csv', index=False)
+    """
+    Stream every payroll row as CSV (default) or Parquet (?format=parquet).
+
+    Rows are paged through a server-side cursor and written straight into the
+    response, so the export runs in constant memory and needs no shared file.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    timestamp = datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S')
+
+    if export_format == 'parquet':
+        if not parquet_available():
+            return jsonify({'error': 'Parquet export is not available on this server'}), 400
+        body = stream_payroll_parquet()
+        mimetype = 'application/vnd.apache.parquet'
+        filename = f'payroll_export_{timestamp}.parquet'
+    elif export_format == 'csv':
+        body = stream_payroll_csv()
+        mimetype = 'text/csv'
+        filename = f'payroll_export_{timestamp}.csv'
+    else:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
 
-    return send_file('payroll_export.csv', as_attachment=True)
\ No newline at end of file
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -1,17 +1,21 @@
-from flask import Blueprint, render_template, request, flash, redirect, send_from_directory, url_for
+from flask import Blueprint, render_template, request, flash, redirect, send_file, url_for, abort, jsonify
 from flask_login import login_required, current_user
 import datetime
-# Assuming you have a database model for reports, adjust as needed
-from models import PayrollReport
+import os
+from models import PayrollReport, PayrollReportBuild
 from app import db
+from services.payroll_reports import (
+    REPORT_FORMATS, REPORT_TYPES, artifact_path, find_reports, start_report_build
+)
 
 report_bp = Blueprint('report', __name__)
 
+
 @report_bp.route('/report', methods=['GET', 'POST'])
 @login_required
 def payroll_home():
-    reports = []
-    if current_user.is_admin: 
+    reports, build = [], None
+    if current_user.is_admin:
         if request.method == 'POST':
             report_type = request.form.get('report_type')
             start_date_str = request.form.get('start_date')
@@ -21,58 +25,82 @@ def payroll_home():
                 start_date = datetime.datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
                 end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
 
-                # Fetch reports based on criteria
-                
-                if report_type == 'monthly' and start_date and end_date:
-                    reports = PayrollReport.query.filter(PayrollReport.report_date >= start_date, PayrollReport.report_date <= end_date).all()
-
-                
-                if report_type == 'monthly' and start_date and end_date:
-                    reports = [
-                        {'report_id': 1, 'report_type': 'monthly', 'report_date': start_date, 'file_path': '/reports/monthly_1.pdf'},
-                        {'report_id': 2, 'report_type': 'monthly', 'report_date': end_date, 'file_path': '/reports/monthly_2.pdf'}
-                    ]
-                elif report_type == 'employee' and start_date and end_date:
-                    reports = [
-                        {'report_id': 3, 'report_type': 'employee', 'report_date': start_date, 'file_path': '/reports/employee_1.pdf'},
-                        {'report_id': 4, 'report_type': 'employee', 'report_date': end_date, 'file_path': '/reports/employee_2.pdf'}
-                    ]
-
-                if not reports:
+                if report_type in REPORT_TYPES and start_date and end_date:
+                    # Reports are materialized once and read back afterwards; (re)building
+                    # renders every PDF, so it runs as a background task
+                    reports = find_reports(report_type, start_date, end_date)
+                    if not reports or request.form.get('rebuild'):
+                        build = start_report_build(report_type, start_date, end_date, created_by=current_user.id)
+                        if build.is_active:
+                            flash('Reports are being built. Refresh this page in a moment.', 'info')
+                        else:
+                            reports = find_reports(report_type, start_date, end_date)
+
+                if not reports and not (build and build.is_active):
                     flash('No reports found for the given criteria.', 'info')
 
             except ValueError:
                 flash('Invalid date format. Please use YYYY-MM-DD.', 'error')
 
-        return render_template('reports.html', reports=reports)
+        return render_template('reports/reports.html', reports=reports, build=build)
     else:
         flash('You do not have permission to view reports.', 'warning')
         return redirect(url_for('employee.employee_dashboard')) #Or admin dashboard
 
+# Report build progress (API endpoint)
+@report_bp.route('/report/builds/<int:build_id>', methods=['GET'])
+@login_required
+def report_build_status(build_id):
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    build = PayrollReportBuild.query.get_or_404(build_id)
+    return jsonify(build.to_dict())
+
+# Materialized report totals (API endpoint)
+@report_bp.route('/report/<int:report_id>', methods=['GET'])
+@login_required
+def report_details(report_id):
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    report = PayrollReport.query.get_or_404(report_id)
+    return jsonify(report.to_dict())
+
 @report_bp.route('/report/download/<int:report_id>')
 @login_required
 def download_report(report_id):
-    if current_user.is_admin:
-        # Fetch the report from the database or wherever it's stored
-        report = PayrollReport.query.get_or_404(report_id)
-        
-        report = next((r for r in [
-            {'report_id': 1, 'report_type': 'monthly', 'report_date': datetime.date(2023, 1, 1), 'file_path': '/reports/monthly_1.pdf'},
-            {'report_id': 2, 'report_type': 'monthly', 'report_date': datetime.date(2023, 2, 1), 'file_path': '/reports/monthly_2.pdf'},
-            {'report_id': 3, 'report_type': 'employee', 'report_date': datetime.date(2023, 3, 1), 'file_path': '/reports/employee_1.pdf'},
-            {'report_id': 4, 'report_type': 'employee', 'report_date': datetime.date(2023, 4, 1), 'file_path': '/reports/employee_2.pdf'}
-        ] if r['report_id'] == report_id), None)
-        if report:
-            # Logic to send the file to the user
-            return send_from_directory(app.config['UPLOAD_FOLDER'], report.file_path)
-            
-            flash(f"Download initiated for report ID: {report_id}", "success")
-            return redirect(report['file_path']) 
-        else:
-            flash('Report not found.', 'error')
-            return redirect(url_for('report.payroll_home'))
-    else:
+    """
+    Serve a materialized report's PDF (default) or CSV (?format=csv).
+
+    The artifact's content digest is the ETag, so unchanged reports answer
+    If-None-Match with 304, and Range requests are served from the stored file.
+    """
+    if not current_user.is_admin:
         flash('You do not have permission to download reports.', 'warning')
         return redirect(url_for('employee.employee_dashboard'))
-    
 
+    report = PayrollReport.query.get_or_404(report_id)
+    file_format = request.args.get('format', 'pdf').lower()
+    if file_format not in REPORT_FORMATS:
+        abort(400)
+
+    digest = report.digest(file_format)
+    path = artifact_path(digest, file_format) if digest else None
+    if path is None or not os.path.exists(path):
+        flash('This report has not been generated yet.', 'error')
+        return redirect(url_for('report.payroll_home'))
+
+    filename = f"payroll_{report.report_type}_{report.period_start:%Y%m}"
+    if report.employee_id:
+        filename = f"{filename}_employee_{report.employee_id}"
+    return send_file(
+        os.path.abspath(path),
+        mimetype=REPORT_FORMATS[file_format],
+        as_attachment=True,
+        download_name=f"{filename}.{file_format}",
+        conditional=True,
+        etag=digest,
+        last_modified=report.generated_at,
+        max_age=0
+    )
@@ -0,0 +1,184 @@
+"""
+Measure payroll search latency (services/payroll_search.py) on a large table.
+
+Seeds a SQLite database (default 2M payroll rows) through the ORM metadata,
+then times first pages and deep keyset pages for each search shape and
+prints p50/p99 latencies, the query plan of each shape and, for contrast, the
+cost of reaching the same depth with OFFSET. Point --database-url at an
+existing, already seeded MySQL/PostgreSQL database to measure it instead
+(seeding is skipped there).
+
+    python database/benchmark_payroll_search.py [--rows 2000000] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+from flask import Flask
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import db  # noqa: E402
+from models import Employee, Payroll  # noqa: E402
+from services.payroll_search import _search_query, decode_cursor, search_payrolls  # noqa: E402
+
+EMPLOYEES = 20000
+COMPANIES = 50
+BATCH = 100000
+SAMPLES = 200
+DEEP_PAGES = 20
+
+
+def seed(rows):
+    """Bulk-load employees and one payroll per employee per month"""
+    rng = np.random.default_rng(42)
+    db.session.execute(Employee.__table__.insert(), [
+        {'id': i, 'employee_id': i, 'first_name': 'Seed', 'last_name': str(i), 'email': f'seed{i}@example.com',
+         'hire_date': date(2015, 1, 1), 'position': 'Engineer', 'department': 'Engineering', 'salary': 5000.0,
+         'company_id': i % COMPANIES + 1}
+        for i in range(1, EMPLOYEES + 1)
+    ])
+
+    months = [date(2000 + m // 12, m % 12 + 1, 28) for m in range(rows // EMPLOYEES + 1)]
+    statuses = np.array(['paid', 'pending', 'cancelled'])
+    for offset in range(0, rows, BATCH):
+        n = min(BATCH, rows - offset)
+        index = np.arange(offset, offset + n)
+        employee_ids = index % EMPLOYEES + 1
+        gross = rng.uniform(3000, 9000, n).round(2)
+        status = statuses[rng.choice(3, n, p=[0.9, 0.08, 0.02])]
+        db.session.execute(Payroll.__table__.insert(), [
+            {'employee_id': int(e), 'company_id': int(e) % COMPANIES + 1, 'basic_salary': float(g),
+             'gross_salary': float(g), 'tax_deduction': float(g) * 0.2, 'net_salary': float(g) * 0.8,
+             'payment_date': months[i // EMPLOYEES], 'payment_status': s}
+            for i, e, g, s in zip(index, employee_ids, gross, status)
+        ])
+    db.session.commit()
+
+
+def search_shapes(months):
+    """(description, search criteria factory) for each search the payroll screens run"""
+    recent = months[-13:-1]
+
+    def employee_year(rng):
+        return {'employee_id': int(rng.integers(1, EMPLOYEES + 1)), 'start_date': recent[0], 'end_date': recent[-1]}
+
+    def company_month(rng):
+        month = recent[int(rng.integers(len(recent)))]
+        return {'company_id': int(rng.integers(1, COMPANIES + 1)), 'start_date': month.replace(day=1),
+                'end_date': month}
+
+    def company_pending(rng):
+        return {'company_id': int(rng.integers(1, COMPANIES + 1)), 'status': 'pending'}
+
+    def period_only(rng):
+        month = recent[int(rng.integers(len(recent)))]
+        return {'start_date': month.replace(day=1), 'end_date': month}
+
+    return [
+        ('employee, last 12 months', employee_year),
+        ('company, one month', company_month),
+        ('company, pending status', company_pending),
+        ('all companies, one month', period_only),
+    ]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000, samples[max(int(len(samples) * 0.99) - 1, 0)] * 1000
+
+
+def explain(criteria):
+    query = _search_query(**criteria).limit(51)
+    dialect = db.engine.dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN' if dialect.name == 'sqlite' else 'EXPLAIN'
+    return ' | '.join(str(row[-1]) for row in db.session.execute(text(f'{prefix} {sql}')))
+
+
+def measure(description, make_criteria, rng):
+    first_page, deep_page, deep = [], [], None
+    for _ in range(SAMPLES):
+        criteria = make_criteria(rng)
+        started = time.perf_counter()
+        rows, next_after = search_payrolls(**criteria)
+        first_page.append(time.perf_counter() - started)
+
+        # Follow the cursor to page DEEP_PAGES and time the last hop
+        page = 1
+        while next_after is not None and page < DEEP_PAGES:
+            cursor = next_after
+            started = time.perf_counter()
+            rows, next_after = search_payrolls(after=cursor, **criteria)
+            elapsed = time.perf_counter() - started
+            page += 1
+        if page == DEEP_PAGES:
+            deep_page.append(elapsed)
+            deep = (criteria, cursor)
+
+    p50, p99 = percentiles(first_page)
+    line = f"{description:<28} first page p50 {p50:6.2f} ms  p99 {p99:6.2f} ms"
+    if deep_page:
+        p50, p99 = percentiles(deep_page)
+        line += f" | page {DEEP_PAGES} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms"
+    print(line)
+    print(f"    plan: {explain(make_criteria(rng))}")
+
+    if deep is not None:
+        # Same depth reached with OFFSET instead of the cursor
+        criteria, cursor = deep
+        depth = (DEEP_PAGES - 1) * 50
+        started = time.perf_counter()
+        _search_query(**criteria).offset(depth).limit(51).all()
+        offset_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        _search_query(after=decode_cursor(cursor), **criteria).limit(51).all()
+        keyset_ms = (time.perf_counter() - started) * 1000
+        print(f"    row {depth}: OFFSET {offset_ms:.2f} ms vs keyset {keyset_ms:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000000, help='payroll rows to seed (SQLite only)')
+    parser.add_argument('--database-url', help='measure an existing seeded database instead of SQLite')
+    args = parser.parse_args()
+
+    workdir = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(workdir.name, 'payroll_search.db')}"
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(app)
+
+    with app.app_context():
+        if workdir is not None:
+            db.create_all()
+            print(f"Seeding {args.rows:,} payroll rows...")
+            started = time.perf_counter()
+            seed(args.rows)
+            db.session.execute(text('ANALYZE'))
+            print(f"Seeded in {time.perf_counter() - started:.0f}s")
+
+        months = [payment_date for payment_date, in db.session.query(Payroll.payment_date).filter(
+            Payroll.payment_date.isnot(None)
+        ).distinct().order_by(Payroll.payment_date.desc()).limit(14)][::-1]
+
+        rng = np.random.default_rng(7)
+        for description, make_criteria in search_shapes(months):
+            measure(description, make_criteria, rng)
+
+    if workdir is not None:
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
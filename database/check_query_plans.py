@@ -0,0 +1,165 @@
+"""
+Check that the dashboard and agent queries are served by the model indexes.
+
+Seeds a SQLite database (default 1M attendance rows) through the ORM metadata,
+runs EXPLAIN QUERY PLAN for each hot query and fails if the expected index is
+not used. Point --database-url at an existing, already seeded MySQL/PostgreSQL
+database to check its plans instead (seeding is skipped there).
+
+    python database/check_query_plans.py [--rows 1000000] [--database-url URL]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+from flask import Flask
+from sqlalchemy import select, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import db  # noqa: E402
+from models import Employee, Attendance, Leave, Payroll  # noqa: E402
+from services.payroll_search import _search_query  # noqa: E402
+from services.dashboard_data import attendance_query, employee_query, payroll_history_query  # noqa: E402
+from agentic.agent import PayrollAgent  # noqa: E402
+
+EMPLOYEES = 20000
+BATCH = 50000
+
+
+def seed(rows):
+    """Bulk-load employees, attendance, leave and payroll rows with random data"""
+    rng = np.random.default_rng(42)
+    start = date(2023, 1, 1)
+    days = [start + timedelta(days=int(d)) for d in range(730)]
+
+    db.session.execute(Employee.__table__.insert(), [
+        {'id': i, 'employee_id': i, 'first_name': 'Seed', 'last_name': str(i), 'email': f'seed{i}@example.com',
+         'hire_date': start, 'position': 'Engineer', 'department': 'Engineering', 'salary': 5000.0,
+         'user_id': i, 'company_id': i % 50 + 1}
+        for i in range(1, EMPLOYEES + 1)
+    ])
+
+    statuses = np.array(['present', 'late', 'absent', 'half_day'])
+    for offset in range(0, rows, BATCH):
+        n = min(BATCH, rows - offset)
+        employee_ids = rng.integers(1, EMPLOYEES + 1, n)
+        day_index = rng.integers(0, len(days), n)
+        status = statuses[rng.choice(4, n, p=[0.8, 0.1, 0.05, 0.05])]
+        db.session.execute(Attendance.__table__.insert(), [
+            {'employee_id': int(e), 'user_id': int(e), 'date': days[d], 'status': s,
+             'working_hours': 8.0, 'overtime_hours': 0.0}
+            for e, d, s in zip(employee_ids, day_index, status)
+        ])
+
+    leave_rows = rows // 10
+    employee_ids = rng.integers(1, EMPLOYEES + 1, leave_rows)
+    day_index = rng.integers(0, len(days) - 5, leave_rows)
+    leave_status = np.array(['pending', 'approved', 'rejected'])[rng.choice(3, leave_rows, p=[0.2, 0.7, 0.1])]
+    db.session.execute(Leave.__table__.insert(), [
+        {'employee_id': int(e), 'leave_type': 'annual', 'start_date': days[d], 'end_date': days[d + 2],
+         'days': 3, 'status': s}
+        for e, d, s in zip(employee_ids, day_index, leave_status)
+    ])
+
+    payroll_rows = EMPLOYEES * 24
+    db.session.execute(Payroll.__table__.insert(), [
+        {'employee_id': i % EMPLOYEES + 1, 'company_id': (i % EMPLOYEES) % 50 + 1, 'basic_salary': 5000.0,
+         'gross_salary': 5200.0, 'net_salary': 4200.0, 'tax_deduction': 1000.0,
+         'payment_date': days[(i // EMPLOYEES) * 30], 'payment_status': 'paid'}
+        for i in range(payroll_rows)
+    ])
+    db.session.commit()
+
+
+def hot_queries():
+    """(description, statement, expected index) for each query that must hit an index"""
+    month_start, month_end = date(2024, 6, 1), date(2024, 7, 1)
+    some_employees = list(range(1, 201))
+    return [
+        ('agent: attendance totals for the month',
+         PayrollAgent.attendance_totals_query(some_employees, 6, 2024).statement,
+         'ix_attendances_employee_date'),
+        ('agent: approved leave days',
+         PayrollAgent.approved_leave_days_query(some_employees, 6, 2024).statement,
+         'ix_leaves_employee_status_start'),
+        ('agent: historical average gross',
+         PayrollAgent.average_paid_gross_query(some_employees).statement,
+         'ix_payrolls_employee_payment_date'),
+        ('dashboard: attendance for the current user',
+         attendance_query(42, today=date(2024, 6, 15)).statement,
+         'ix_attendances_user_date'),
+        ('dashboard: payroll history for an employee',
+         payroll_history_query(42).statement,
+         'ix_payrolls_employee_payment_date'),
+        ('dashboard: employee for the current user',
+         employee_query(42).statement,
+         'ix_employees_user_id'),
+        ('company: employees of a company',
+         select(Employee).where(Employee.company_id == 7),
+         'ix_employees_company_id'),
+        ('company: payroll for a period',
+         select(Payroll).where(Payroll.company_id == 7, Payroll.payment_date >= month_start,
+                               Payroll.payment_date < month_end),
+         'ix_payrolls_company_payment_date'),
+        ('payroll search: company page after a cursor',
+         _search_query(company_id=7, status='paid', start_date=month_start, end_date=date(2024, 6, 30),
+                       after=(date(2024, 6, 28), 100000)).limit(51).statement,
+         'ix_payrolls_company_payment_date'),
+    ]
+
+
+def explain(statement):
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        return ' | '.join(str(row[-1]) for row in rows)
+    rows = db.session.execute(text(f'EXPLAIN {sql}')).all()
+    return ' | '.join(' '.join(str(value) for value in row) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='attendance rows to seed (SQLite only)')
+    parser.add_argument('--database-url', help='check an existing seeded database instead of SQLite')
+    args = parser.parse_args()
+
+    workdir = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(workdir.name, 'query_plans.db')}"
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(app)
+
+    failures = 0
+    with app.app_context():
+        if workdir is not None:
+            db.create_all()
+            print(f"Seeding {args.rows:,} attendance rows...")
+            seed(args.rows)
+            db.session.execute(text('ANALYZE'))
+
+        for description, statement, index_name in hot_queries():
+            plan = explain(statement)
+            ok = index_name in plan
+            failures += not ok
+            print(f"[{'ok' if ok else 'FAIL'}] {description}: expected {index_name}\n       {plan}")
+
+    if workdir is not None:
+        workdir.cleanup()
+    if failures:
+        print(f"{failures} quer{'y' if failures == 1 else 'ies'} not using the expected index")
+        sys.exit(1)
+    print("All hot queries use their indexes")
+
+
+if __name__ == '__main__':
+    main()
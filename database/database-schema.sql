@@ -22,7 +22,9 @@ CREATE TABLE IF NOT EXISTS timesheets (
     date DATE NOT NULL,
     hours_worked DECIMAL(5, 2) NOT NULL,
     is_overtime BOOLEAN DEFAULT FALSE,
-    FOREIGN KEY (employee_id) REFERENCES employees(employee_id)
+    FOREIGN KEY (employee_id) REFERENCES employees(employee_id),
+    INDEX ix_timesheets_employee_date (employee_id, date),
+    INDEX ix_timesheets_date (date)
 );
 
 -- Create payroll_records table
@@ -37,7 +39,9 @@ CREATE TABLE IF NOT EXISTS payroll_records (
     medicare DECIMAL(10, 2) NOT NULL,
     net_salary DECIMAL(10, 2) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (employee_id) REFERENCES employees(employee_id)
+    FOREIGN KEY (employee_id) REFERENCES employees(employee_id),
+    INDEX ix_payroll_records_employee_date (employee_id, payroll_date),
+    INDEX ix_payroll_records_date (payroll_date)
 );
 
 -- Create user for application
@@ -0,0 +1,28 @@
+-- Payroll columns read by the dashboards, the agent and the monthly rollup,
+-- and the rollup table itself (PayrollMonthlyRollup). Mirrors models/payroll.py.
+-- Applies before 001, whose payroll indexes cover these columns.
+-- Backfill the rollup afterwards with `flask rebuild-payroll-rollups`.
+
+ALTER TABLE payrolls
+    ADD COLUMN company_id INT NULL,
+    ADD COLUMN gross_salary FLOAT NULL DEFAULT 0,
+    ADD COLUMN tax_deduction FLOAT NULL DEFAULT 0,
+    ADD COLUMN payment_date DATE NULL,
+    ADD COLUMN payment_status VARCHAR(20) NULL DEFAULT 'pending',
+    ADD CONSTRAINT fk_payrolls_company FOREIGN KEY (company_id) REFERENCES companies(id);
+
+-- Payrolls without a company or department roll up under 0 / '' so the
+-- unique period key also covers them and deltas can be upserted
+CREATE TABLE IF NOT EXISTS payroll_monthly_rollups (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    company_id INT NOT NULL DEFAULT 0,
+    department VARCHAR(100) NOT NULL DEFAULT '',
+    year INT NOT NULL,
+    month INT NOT NULL,
+    payroll_count INT NOT NULL DEFAULT 0,
+    total_gross FLOAT NOT NULL DEFAULT 0,
+    total_net FLOAT NOT NULL DEFAULT 0,
+    total_tax FLOAT NOT NULL DEFAULT 0,
+    updated_at DATETIME NULL,
+    CONSTRAINT uq_payroll_rollup_period UNIQUE (company_id, department, year, month)
+);
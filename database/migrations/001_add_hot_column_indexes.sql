@@ -0,0 +1,25 @@
+-- Secondary and composite indexes for the hot filter columns used by the
+-- dashboards, reports and PayrollAgent. Mirrors the Index declarations in models/.
+
+-- Employee lookups by user and company
+ALTER TABLE employees
+    ADD COLUMN user_id INT NULL,
+    ADD COLUMN company_id INT NULL,
+    ADD CONSTRAINT fk_employees_user FOREIGN KEY (user_id) REFERENCES user(id),
+    ADD CONSTRAINT fk_employees_company FOREIGN KEY (company_id) REFERENCES companies(id);
+CREATE INDEX ix_employees_user_id ON employees (user_id);
+CREATE INDEX ix_employees_company_id ON employees (company_id);
+
+-- Attendance per employee / user within a period, and company-wide period scans
+CREATE INDEX ix_attendances_employee_date ON attendances (employee_id, date);
+CREATE INDEX ix_attendances_user_date ON attendances (user_id, date);
+CREATE INDEX ix_attendances_date ON attendances (date);
+
+-- Approved leave per employee, and leave by status within a period
+CREATE INDEX ix_leaves_employee_status_start ON leaves (employee_id, status, start_date);
+CREATE INDEX ix_leaves_status_start ON leaves (status, start_date);
+
+-- Payroll history per employee and per company, and period scans
+CREATE INDEX ix_payrolls_employee_payment_date ON payrolls (employee_id, payment_date);
+CREATE INDEX ix_payrolls_company_payment_date ON payrolls (company_id, payment_date);
+CREATE INDEX ix_payrolls_payment_date ON payrolls (payment_date);
@@ -0,0 +1,33 @@
+-- Asynchronous pay runs (services/pay_run.py) and the link from each payroll
+-- to the run that produced it. Mirrors models/payroll.py.
+
+CREATE TABLE IF NOT EXISTS pay_runs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    company_id INT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    payment_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    batch_size INT NOT NULL DEFAULT 500,
+    render_payslips BOOLEAN NOT NULL DEFAULT TRUE,
+    send_notifications BOOLEAN NOT NULL DEFAULT TRUE,
+    total_employees INT NOT NULL DEFAULT 0,
+    total_batches INT NOT NULL DEFAULT 0,
+    completed_batches INT NOT NULL DEFAULT 0,
+    failed_batches INT NOT NULL DEFAULT 0,
+    processed_employees INT NOT NULL DEFAULT 0,
+    payslips_rendered INT NOT NULL DEFAULT 0,
+    notifications_sent INT NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    created_by INT NULL,
+    created_at DATETIME NULL,
+    started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    FOREIGN KEY (company_id) REFERENCES companies(id),
+    FOREIGN KEY (created_by) REFERENCES user(id)
+);
+
+ALTER TABLE payrolls
+    ADD COLUMN pay_run_id INT NULL,
+    ADD CONSTRAINT fk_payrolls_pay_run FOREIGN KEY (pay_run_id) REFERENCES pay_runs(id);
+CREATE INDEX ix_payrolls_pay_run_id ON payrolls (pay_run_id);
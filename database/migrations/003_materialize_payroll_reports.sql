@@ -0,0 +1,46 @@
+-- Materialized payroll reports (services/payroll_reports.py): report scope,
+-- extra totals, the digests of the rendered artifacts in content-addressed
+-- storage, and the background builds that produce them. Mirrors models/payroll.py.
+
+ALTER TABLE payroll_reports
+    ADD COLUMN report_type VARCHAR(20) NOT NULL DEFAULT 'monthly',
+    ADD COLUMN company_id INT NULL,
+    ADD COLUMN employee_id INT NULL,
+    ADD COLUMN period_start DATE NULL,
+    ADD COLUMN period_end DATE NULL,
+    ADD COLUMN total_gross FLOAT NOT NULL DEFAULT 0,
+    ADD COLUMN total_tax FLOAT NOT NULL DEFAULT 0,
+    ADD COLUMN pdf_digest VARCHAR(64) NULL,
+    ADD COLUMN pdf_size INT NULL,
+    ADD COLUMN csv_digest VARCHAR(64) NULL,
+    ADD COLUMN csv_size INT NULL,
+    ADD COLUMN generated_at DATETIME NULL,
+    ADD COLUMN company_scope INT AS (COALESCE(company_id, 0)) STORED,
+    ADD COLUMN employee_scope INT AS (COALESCE(employee_id, 0)) STORED,
+    ADD CONSTRAINT fk_payroll_reports_company FOREIGN KEY (company_id) REFERENCES companies(id),
+    ADD CONSTRAINT fk_payroll_reports_employee FOREIGN KEY (employee_id) REFERENCES employees(id);
+CREATE INDEX ix_payroll_reports_type_period ON payroll_reports (report_type, period_start, period_end);
+CREATE INDEX ix_payroll_reports_employee_id ON payroll_reports (employee_id);
+-- One report per scope; the *_scope columns stand in for the nullable ids,
+-- since NULLs never collide in a unique key
+ALTER TABLE payroll_reports
+    ADD CONSTRAINT uq_payroll_reports_scope
+        UNIQUE (report_type, company_scope, employee_scope, period_start, period_end);
+
+-- Background report builds started from the reports page
+CREATE TABLE IF NOT EXISTS payroll_report_builds (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    report_type VARCHAR(20) NOT NULL,
+    company_id INT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    report_count INT NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    created_by INT NULL,
+    created_at DATETIME NULL,
+    started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    FOREIGN KEY (company_id) REFERENCES companies(id),
+    FOREIGN KEY (created_by) REFERENCES user(id)
+);
@@ -0,0 +1,16 @@
+-- Widen the payroll period indexes into covering indexes for payroll search
+-- (services/payroll_search.py): each adds id for the keyset order and the
+-- listed columns, so a search page is read from the index alone.
+-- One ALTER, so the foreign keys on employee_id/company_id always have an index.
+-- Mirrors models/payroll.py.
+
+ALTER TABLE payrolls
+    DROP INDEX ix_payrolls_employee_payment_date,
+    ADD INDEX ix_payrolls_employee_payment_date
+        (employee_id, payment_date, id, company_id, payment_status, gross_salary, net_salary),
+    DROP INDEX ix_payrolls_company_payment_date,
+    ADD INDEX ix_payrolls_company_payment_date
+        (company_id, payment_date, id, employee_id, payment_status, gross_salary, net_salary),
+    DROP INDEX ix_payrolls_payment_date,
+    ADD INDEX ix_payrolls_payment_date
+        (payment_date, id, employee_id, company_id, payment_status, gross_salary, net_salary);
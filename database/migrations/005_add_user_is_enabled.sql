@@ -0,0 +1,9 @@
+-- Email verification flag read by services/user_principal.py when loading the
+-- login principal. New users start disabled until they verify their email;
+-- accounts that existed before the column are backfilled as enabled so they
+-- can still log in. Mirrors models/user.py.
+
+ALTER TABLE user
+    ADD COLUMN is_enabled BOOLEAN DEFAULT FALSE;
+
+UPDATE user SET is_enabled = TRUE;
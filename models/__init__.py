@@ -6,7 +6,7 @@ from .attendance import Attendance
 from .company import Company
 
 from .department import Department
-from .payroll import Payroll, PayrollBenefit, PayrollOtherDeduction, PayrollReport
+from .payroll import Payroll, PayrollBenefit, PayrollOtherDeduction, PayrollReport, PayrollReportBuild, PayrollMonthlyRollup, PayRun
 from .leave import Leave, LeaveAllocation, LeaveEntitlement
 
 from .holiday import Holiday, HolidayType
@@ -17,6 +17,11 @@ class Attendance(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_attendances_employee_date', 'employee_id', 'date'),
+        db.Index('ix_attendances_user_date', 'user_id', 'date'),
+        db.Index('ix_attendances_date', 'date'),
+    )
     
     # Relationship
     employee = db.relationship('Employee', back_populates='attendances')
@@ -11,7 +11,7 @@ class Company(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    user = db.relationship('User', back_populates='company')
+    user = db.relationship('User', foreign_keys=[admin_id])
     employees = db.relationship('Employee', back_populates='company')
     payrolls = db.relationship('Payroll', back_populates='company')
 
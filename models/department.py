@@ -10,7 +10,9 @@ class Department(db.Model):
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    employees = db.relationship('Employee', back_populates='department')
+    # Employee.department holds the department name rather than a foreign key
+    employees = db.relationship('Employee', primaryjoin='foreign(Employee.department) == Department.name',
+                                viewonly=True)
 
 
     
@@ -22,10 +22,17 @@ class Employee(db.Model):
     position = db.Column(db.String(100), nullable=False)
     department = db.Column(db.String(100), nullable=False)
     salary = db.Column(db.Float, default=0.0)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=True, index=True)
 
     # Relationships
-    paid_activities = db.relationship('PaidActivity', back_populates='employee', cascade='all, delete-orphan')
-    provider_rates = db.relationship('ProviderRate', back_populates='employee', cascade='all, delete-orphan')
+    user = db.relationship('User', back_populates='employee')
+    company = db.relationship('Company', back_populates='employees')
+    payrolls = db.relationship('Payroll', back_populates='employee')
+    attendances = db.relationship('Attendance', back_populates='employee')
+    leaves = db.relationship('Leave', back_populates='employee')
+    leave_entitlements = db.relationship('LeaveEntitlement', back_populates='employee')
+    leave_allocations = db.relationship('LeaveAllocation', back_populates='employee')
     
     @property
     def full_name(self):
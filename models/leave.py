@@ -18,6 +18,11 @@ class Leave(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
+    __table_args__ = (
+        db.Index('ix_leaves_employee_status_start', 'employee_id', 'status', 'start_date'),
+        db.Index('ix_leaves_status_start', 'status', 'start_date'),
+    )
+    
     # Relationships
     employee = db.relationship('Employee', back_populates='leaves')
     approver = db.relationship('User', foreign_keys=[approved_by])
@@ -1,19 +1,42 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, event, select, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import relationship, Session, object_session
+from sqlalchemy.orm.attributes import get_history
 from app import db
 
+# Columns a payroll search page lists, carried in the search indexes so pages are read from the index alone
+SEARCH_INDEX_COLUMNS = ('payment_status', 'gross_salary', 'net_salary')
+
 class Payroll(db.Model):
     __tablename__ = 'payrolls'
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, ForeignKey('employees.id'), nullable=False)
+    company_id = db.Column(db.Integer, ForeignKey('companies.id'), nullable=True)
+    pay_run_id = db.Column(db.Integer, ForeignKey('pay_runs.id'), nullable=True, index=True)
     basic_salary = db.Column(db.Float, nullable=False)
     bonuses = db.Column(db.Float, default=0.0)
     deductions = db.Column(db.Float, default=0.0)
+    gross_salary = db.Column(db.Float, default=0.0)
+    tax_deduction = db.Column(db.Float, default=0.0)
     net_salary = db.Column(db.Float, nullable=False)
+    payment_date = db.Column(db.Date, nullable=True)
+    payment_status = db.Column(db.String(20), default='pending')  # pending, approved, paid, cancelled
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Filter columns, then (payment_date, id) in the order search pages are read
+        db.Index('ix_payrolls_employee_payment_date', 'employee_id', 'payment_date', 'id', 'company_id',
+                 *SEARCH_INDEX_COLUMNS),
+        db.Index('ix_payrolls_company_payment_date', 'company_id', 'payment_date', 'id', 'employee_id',
+                 *SEARCH_INDEX_COLUMNS),
+        db.Index('ix_payrolls_payment_date', 'payment_date', 'id', 'employee_id', 'company_id',
+                 *SEARCH_INDEX_COLUMNS),
+    )
+    
     employee = db.relationship('Employee', back_populates='payrolls')
+    company = db.relationship('Company', back_populates='payrolls')
+    pay_run = db.relationship('PayRun', back_populates='payrolls')
     benefits = db.relationship('PayrollBenefit', back_populates='payroll', cascade='all, delete-orphan')
     other_deductions = db.relationship('PayrollOtherDeduction', back_populates='payroll', cascade='all, delete-orphan')
 
@@ -37,15 +60,85 @@ class PayrollOtherDeduction(db.Model):
     payroll = db.relationship('Payroll', back_populates='other_deductions')
 
 class PayrollReport(db.Model):
+    """
+    A materialized payroll report: totals for one calendar month (report_type
+    'monthly') or for one employee over a range of months ('employee'),
+    computed by services/payroll_reports.py. The rendered PDF and CSV live in
+    content-addressed storage under their SHA-256 digests.
+    """
     __tablename__ = 'payroll_reports'
     id = db.Column(db.Integer, primary_key=True)
+    report_type = db.Column(db.String(20), nullable=False, default='monthly')  # monthly, employee
+    company_id = db.Column(db.Integer, ForeignKey('companies.id'), nullable=True)
+    employee_id = db.Column(db.Integer, ForeignKey('employees.id'), nullable=True)
+    period_start = db.Column(db.Date, nullable=True)
+    period_end = db.Column(db.Date, nullable=True)  # inclusive
     total_employees = db.Column(db.Integer, nullable=False, default=0)
     total_payrolls = db.Column(db.Integer, nullable=False, default=0)
+    total_gross = db.Column(db.Float, nullable=False, default=0.0)
+    total_tax = db.Column(db.Float, nullable=False, default=0.0)
     total_salaries_paid = db.Column(db.Float, nullable=False, default=0.0)
     total_deductions = db.Column(db.Float, nullable=False, default=0.0)
     total_bonuses = db.Column(db.Float, nullable=False, default=0.0)
+    pdf_digest = db.Column(db.String(64), nullable=True)
+    pdf_size = db.Column(db.Integer, nullable=True)
+    csv_digest = db.Column(db.String(64), nullable=True)
+    csv_size = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # company_id/employee_id with NULL as 0, so the scope key below also holds
+    # for reports without a company or employee (NULLs never collide in UNIQUE)
+    company_scope = db.Column(db.Integer, db.Computed('coalesce(company_id, 0)', persisted=True))
+    employee_scope = db.Column(db.Integer, db.Computed('coalesce(employee_id, 0)', persisted=True))
+
+    __table_args__ = (
+        db.Index('ix_payroll_reports_type_period', 'report_type', 'period_start', 'period_end'),
+        db.Index('ix_payroll_reports_employee_id', 'employee_id'),
+        # One report per (report_type, company_id, employee_id, period), even with concurrent builds
+        db.UniqueConstraint('report_type', 'company_scope', 'employee_scope', 'period_start', 'period_end',
+                            name='uq_payroll_reports_scope'),
+    )
+
+    @property
+    def report_date(self):
+        return self.period_start
+
+    @property
+    def title(self):
+        if self.period_start is None:
+            return f"Payroll report {self.id}"
+        period = f"{self.period_start:%b %Y}"
+        if self.period_end and (self.period_end.year, self.period_end.month) != (self.period_start.year,
+                                                                                self.period_start.month):
+            period = f"{period} - {self.period_end:%b %Y}"
+        if self.report_type == 'employee':
+            return f"Employee {self.employee_id} payroll, {period}"
+        return f"Monthly payroll, {period}"
+
+    def digest(self, file_format):
+        return self.pdf_digest if file_format == 'pdf' else self.csv_digest
+
+    def to_dict(self):
+        return {
+            'report_id': self.id,
+            'report_type': self.report_type,
+            'title': self.title,
+            'company_id': self.company_id,
+            'employee_id': self.employee_id,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'period_end': self.period_end.isoformat() if self.period_end else None,
+            'total_employees': self.total_employees,
+            'total_payrolls': self.total_payrolls,
+            'total_gross': self.total_gross,
+            'total_tax': self.total_tax,
+            'total_salaries_paid': self.total_salaries_paid,
+            'total_deductions': self.total_deductions,
+            'total_bonuses': self.total_bonuses,
+            'pdf_size': self.pdf_size,
+            'csv_size': self.csv_size,
+            'generated_at': self.generated_at.isoformat() if self.generated_at else None
+        }
+
     @property
     def total_employees_count(self):
         return self.total_employees
@@ -65,3 +158,339 @@ class PayrollReport(db.Model):
     @property
     def total_bonuses_amount(self):
         return self.total_bonuses
+
+
+class PayrollReportBuild(db.Model):
+    """
+    One background materialization of payroll reports for a scope, run by the
+    Celery task in services/payroll_reports.py; the reports page shows it as
+    building until it completes.
+    """
+    __tablename__ = 'payroll_report_builds'
+    id = db.Column(db.Integer, primary_key=True)
+    report_type = db.Column(db.String(20), nullable=False)
+    company_id = db.Column(db.Integer, ForeignKey('companies.id'), nullable=True)
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)  # inclusive
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    report_count = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def is_active(self):
+        return self.status in ('pending', 'running')
+
+    def to_dict(self):
+        return {
+            'build_id': self.id,
+            'status': self.status,
+            'report_type': self.report_type,
+            'company_id': self.company_id,
+            'period_start': self.period_start.isoformat(),
+            'period_end': self.period_end.isoformat(),
+            'report_count': self.report_count,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class PayrollMonthlyRollup(db.Model):
+    """
+    Payroll totals per company, department and payment month.
+
+    Maintained incrementally by the Payroll flush events below, so trend
+    queries read a handful of rollup rows instead of scanning payrolls.
+    Payrolls without a company or department are rolled up under
+    NO_COMPANY / NO_DEPARTMENT rather than NULL, so the unique period key
+    also holds for them and rows can be upserted.
+    """
+    __tablename__ = 'payroll_monthly_rollups'
+    NO_COMPANY = 0
+    NO_DEPARTMENT = ''
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, nullable=False, default=NO_COMPANY)
+    department = db.Column(db.String(100), nullable=False, default=NO_DEPARTMENT)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    payroll_count = db.Column(db.Integer, nullable=False, default=0)
+    total_gross = db.Column(db.Float, nullable=False, default=0.0)
+    total_net = db.Column(db.Float, nullable=False, default=0.0)
+    total_tax = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'department', 'year', 'month', name='uq_payroll_rollup_period'),
+    )
+
+    @property
+    def avg_gross(self):
+        return self.total_gross / self.payroll_count if self.payroll_count else 0.0
+
+    @property
+    def avg_net(self):
+        return self.total_net / self.payroll_count if self.payroll_count else 0.0
+
+    @property
+    def avg_tax(self):
+        return self.total_tax / self.payroll_count if self.payroll_count else 0.0
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every rollup row from payrolls in one grouped query
+        (backfill/repair; run with `flask rebuild-payroll-rollups`).
+        :return: Number of rollup rows written
+        """
+        from models.employee import Employee
+
+        year = func.extract('year', Payroll.payment_date)
+        month = func.extract('month', Payroll.payment_date)
+        rows = db.session.query(
+            Payroll.company_id,
+            Employee.department,
+            year.label('year'),
+            month.label('month'),
+            func.count(Payroll.id),
+            func.coalesce(func.sum(Payroll.gross_salary), 0.0),
+            func.coalesce(func.sum(Payroll.net_salary), 0.0),
+            func.coalesce(func.sum(Payroll.tax_deduction), 0.0)
+        ).outerjoin(
+            Employee, Employee.id == Payroll.employee_id
+        ).filter(
+            Payroll.payment_date.isnot(None)
+        ).group_by(
+            Payroll.company_id, Employee.department, year, month
+        ).all()
+
+        deltas = {}
+        for company_id, department, y, m, count, gross, net, tax in rows:
+            _merge(deltas, (_rollup_key(company_id, department, int(y), int(m)), [count, gross, net, tax]))
+
+        db.session.query(cls).delete()
+        db.session.bulk_insert_mappings(cls, [
+            {'company_id': company_id, 'department': department, 'year': y, 'month': m,
+             'payroll_count': count, 'total_gross': gross, 'total_net': net, 'total_tax': tax}
+            for (company_id, department, y, m), (count, gross, net, tax) in deltas.items()
+        ])
+        db.session.commit()
+        return len(deltas)
+
+
+class PayRun(db.Model):
+    """
+    One asynchronous pay run over a period, processed in employee batches by
+    the Celery tasks in services/pay_run.py. The counters are advanced
+    atomically by each batch and are what the progress endpoint reports.
+    """
+    __tablename__ = 'pay_runs'
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, ForeignKey('companies.id'), nullable=True)
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)  # inclusive
+    payment_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    batch_size = db.Column(db.Integer, nullable=False, default=500)
+    render_payslips = db.Column(db.Boolean, nullable=False, default=True)
+    send_notifications = db.Column(db.Boolean, nullable=False, default=True)
+    total_employees = db.Column(db.Integer, nullable=False, default=0)
+    total_batches = db.Column(db.Integer, nullable=False, default=0)
+    completed_batches = db.Column(db.Integer, nullable=False, default=0)
+    failed_batches = db.Column(db.Integer, nullable=False, default=0)
+    processed_employees = db.Column(db.Integer, nullable=False, default=0)
+    payslips_rendered = db.Column(db.Integer, nullable=False, default=0)
+    notifications_sent = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    payrolls = db.relationship('Payroll', back_populates='pay_run')
+
+    @property
+    def progress(self):
+        if not self.total_employees:
+            return 1.0 if self.status == 'completed' else 0.0
+        return self.processed_employees / self.total_employees
+
+    def to_dict(self):
+        return {
+            'pay_run_id': self.id,
+            'status': self.status,
+            'company_id': self.company_id,
+            'period_start': self.period_start.isoformat(),
+            'period_end': self.period_end.isoformat(),
+            'payment_date': self.payment_date.isoformat(),
+            'total_employees': self.total_employees,
+            'processed_employees': self.processed_employees,
+            'total_batches': self.total_batches,
+            'completed_batches': self.completed_batches,
+            'failed_batches': self.failed_batches,
+            'payslips_rendered': self.payslips_rendered,
+            'notifications_sent': self.notifications_sent,
+            'progress': round(self.progress, 4),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+def _rollup_key(company_id, department, year, month):
+    return (
+        PayrollMonthlyRollup.NO_COMPANY if company_id is None else company_id,
+        department or PayrollMonthlyRollup.NO_DEPARTMENT,
+        year, month
+    )
+
+
+_ROLLUP_KEY_COLUMNS = ('company_id', 'department', 'year', 'month')
+_ROLLUP_TOTAL_COLUMNS = ('payroll_count', 'total_gross', 'total_net', 'total_tax')
+
+
+def apply_rollup_deltas(connection, deltas):
+    """
+    Add per-period deltas to the rollup table with one upsert, so concurrent
+    batches adding to the same period cannot race between update and insert.
+    :param deltas: Mapping of (company_id, department, year, month) ->
+                   [payroll_count, gross, net, tax] to add (negative to remove)
+    """
+    merged = {}
+    for key, totals in deltas.items():
+        _merge(merged, (_rollup_key(*key), totals))
+
+    now = datetime.utcnow()
+    # Sorted so concurrent writers lock rollup rows in the same order
+    rows = [
+        dict(zip(_ROLLUP_KEY_COLUMNS, key), **dict(zip(_ROLLUP_TOTAL_COLUMNS, totals)), updated_at=now)
+        for key, totals in sorted(merged.items()) if any(totals)
+    ]
+    if not rows:
+        return
+
+    table = PayrollMonthlyRollup.__table__
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(
+            updated_at=statement.inserted.updated_at,
+            **{column: table.c[column] + statement.inserted[column] for column in _ROLLUP_TOTAL_COLUMNS}
+        )
+    elif dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(_ROLLUP_KEY_COLUMNS),
+            set_=dict(
+                updated_at=statement.excluded.updated_at,
+                **{column: table.c[column] + statement.excluded[column] for column in _ROLLUP_TOTAL_COLUMNS}
+            )
+        )
+    else:
+        raise NotImplementedError(f"Payroll rollup upsert is not implemented for {dialect}")
+    connection.execute(statement)
+
+
+def rollup_deltas(rows, departments):
+    """
+    Rollup deltas for payroll rows written with core or bulk inserts, which
+    bypass the flush events below; pass the result to apply_rollup_deltas.
+    :param rows: Iterable of payroll column dicts
+    :param departments: Mapping of employee id -> department
+    """
+    deltas = {}
+    for row in rows:
+        payment_date = row.get('payment_date')
+        if payment_date is None:
+            continue
+        key = _rollup_key(row.get('company_id'), departments.get(row['employee_id']), payment_date.year, payment_date.month)
+        _merge(deltas, (key, [
+            1, row.get('gross_salary') or 0.0, row.get('net_salary') or 0.0, row.get('tax_deduction') or 0.0
+        ]))
+    return deltas
+
+
+def _employee_departments(connection, employee_ids):
+    from models.employee import Employee
+    rows = connection.execute(select(Employee.id, Employee.department).where(Employee.id.in_(employee_ids)))
+    return {employee_id: department for employee_id, department in rows}
+
+
+_ROLLUP_FIELDS = ('employee_id', 'company_id', 'payment_date', 'gross_salary', 'net_salary', 'tax_deduction')
+
+
+def _track_previous(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so updates know the old rollup key"""
+
+
+for _field in _ROLLUP_FIELDS:
+    event.listen(getattr(Payroll, _field), 'set', _track_previous, active_history=True)
+
+
+def _previous_value(target, field):
+    history = get_history(target, field)
+    return history.deleted[0] if history.deleted else getattr(target, field)
+
+
+def _merge(deltas, entry):
+    if entry is None:
+        return
+    key, values = entry
+    totals = deltas.setdefault(key, [0, 0.0, 0.0, 0.0])
+    for i, value in enumerate(values):
+        totals[i] += value
+
+
+_PENDING = 'payroll_rollup_pending'
+
+
+def _queue_rollup(target, values, sign):
+    """Record a payroll's rollup change; after_flush applies the whole flush at once"""
+    session = object_session(target)
+    if session is not None and values[2] is not None:
+        session.info.setdefault(_PENDING, []).append((sign, values))
+
+
+@event.listens_for(Payroll, 'after_insert')
+def _rollup_after_insert(mapper, connection, target):
+    _queue_rollup(target, [getattr(target, f) for f in _ROLLUP_FIELDS], 1)
+
+
+@event.listens_for(Payroll, 'after_update')
+def _rollup_after_update(mapper, connection, target):
+    if not any(get_history(target, f).has_changes() for f in _ROLLUP_FIELDS):
+        return
+    _queue_rollup(target, [_previous_value(target, f) for f in _ROLLUP_FIELDS], -1)
+    _queue_rollup(target, [getattr(target, f) for f in _ROLLUP_FIELDS], 1)
+
+
+@event.listens_for(Payroll, 'after_delete')
+def _rollup_after_delete(mapper, connection, target):
+    _queue_rollup(target, [_previous_value(target, f) for f in _ROLLUP_FIELDS], -1)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_queued_rollups(session, flush_context):
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    connection = session.connection()
+    # One department lookup for every payroll in the flush
+    departments = _employee_departments(connection, {values[0] for _, values in pending})
+    deltas = {}
+    for sign, (employee_id, company_id, payment_date, gross, net, tax) in pending:
+        key = _rollup_key(company_id, departments.get(employee_id), payment_date.year, payment_date.month)
+        _merge(deltas, (key, [sign, sign * (gross or 0.0), sign * (net or 0.0), sign * (tax or 0.0)]))
+    apply_rollup_deltas(connection, deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_queued_rollups(session):
+    session.info.pop(_PENDING, None)
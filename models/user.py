@@ -1,8 +1,8 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from itsdangerous import URLSafeTimedSerializer
 from app import db
+from services.password_hasher import get_password_hasher
 
 
 class User(db.Model, UserMixin):
@@ -32,14 +32,14 @@ class User(db.Model, UserMixin):
         
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_password_hasher().hash(password)
     
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_password_hasher().verify(self.password_hash, password)
         
     def verify_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_password_hasher().verify(self.password_hash, password)
     
     def is_admin(self):
         return self.role == 'admin'
@@ -56,9 +56,6 @@ class User(db.Model, UserMixin):
     def is_hr(self):
         return self.role == 'hr'
     
-    def is_enabled(self):
-        return self.is_enabled
-    
     def __repr__(self):
         return f'<User {self.username}>'
 
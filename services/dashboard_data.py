@@ -0,0 +1,97 @@
+from sqlalchemy.orm import joinedload
+
+from models.employee import Employee
+from models.payroll import Payroll
+from models.attendance import Attendance
+from models.leave import Leave
+from models.company import Company
+from services.periods import current_month_bounds, within_period
+from services.search import like_prefix
+
+DASHBOARD_PAYROLL_LIMIT = 12
+COMPANY_SEARCH_PAGE_SIZE = 20
+COMPANY_SEARCH_MAX_PAGE_SIZE = 100
+
+
+def employee_query(user_id):
+    return Employee.query.filter_by(user_id=user_id)
+
+
+def attendance_query(user_id, today=None):
+    # Attendance.__str__/__repr__ read record.employee, so load it in the same query
+    return Attendance.query.options(
+        joinedload(Attendance.employee)
+    ).filter(
+        Attendance.user_id == user_id,
+        within_period(Attendance.date, *current_month_bounds(today))
+    ).order_by(
+        Attendance.date
+    )
+
+
+def payroll_history_query(employee_id, payroll_limit=DASHBOARD_PAYROLL_LIMIT):
+    return Payroll.query.filter(
+        Payroll.employee_id == employee_id
+    ).order_by(
+        Payroll.payment_date.desc(), Payroll.id.desc()
+    ).limit(payroll_limit)
+
+
+def latest_leave_query(employee_id):
+    return Leave.query.filter(
+        Leave.employee_id == employee_id
+    ).order_by(
+        Leave.start_date.desc()
+    ).limit(1)
+
+
+def load_user_dashboard(user_id, payroll_limit=DASHBOARD_PAYROLL_LIMIT, today=None):
+    """
+    Load the records shown on a user's dashboard, bounded so render time does
+    not grow with history: the latest payroll_limit payrolls, the current
+    month's attendance and the most recent leave request.
+
+    The *_query builders above are also what database/check_query_plans.py
+    explains, so the plan check covers the statements that actually run.
+
+    :param user_id: Id of the logged-in user
+    :return: Dict with 'employee', 'payrolls', 'attendance_records' and 'leave'
+    """
+    employee = employee_query(user_id).first()
+    attendance_records = attendance_query(user_id, today).all()
+
+    payrolls, leave = [], None
+    if employee is not None:
+        payrolls = payroll_history_query(employee.id, payroll_limit).all()
+        leave = latest_leave_query(employee.id).first()
+
+    return {
+        'employee': employee,
+        'payrolls': payrolls,
+        'attendance_records': attendance_records,
+        'leave': leave
+    }
+
+
+def search_companies(prefix='', after_name=None, limit=COMPANY_SEARCH_PAGE_SIZE):
+    """
+    Find companies whose name starts with prefix, keyset-paginated by name.
+
+    Plain LIKE on a prefix can use the unique index on name (case-insensitive
+    under MySQL's default collation); ILIKE would wrap the column in lower().
+
+    :param prefix: Leading characters of the company name
+    :param after_name: Last name of the previous page (None for the first page)
+    :param limit: Page size, capped at COMPANY_SEARCH_MAX_PAGE_SIZE
+    :return: (list of {'id', 'name'} dicts, next_after name or None)
+    """
+    limit = max(1, min(int(limit), COMPANY_SEARCH_MAX_PAGE_SIZE))
+    query = Company.query.with_entities(Company.id, Company.name).order_by(Company.name)
+    if prefix:
+        query = query.filter(Company.name.like(like_prefix(prefix), escape='\\'))
+    if after_name:
+        query = query.filter(Company.name > after_name)
+
+    rows = query.limit(limit + 1).all()
+    next_after = rows[limit - 1].name if len(rows) > limit else None
+    return [{'id': row.id, 'name': row.name} for row in rows[:limit]], next_after
@@ -0,0 +1,74 @@
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from models.user import User
+from models.employee import Employee
+from models.payroll import Payroll
+from models.leave import Leave
+from services.cache import TTLCache
+from app import db
+
+STATS_CACHE_TTL = 30  # seconds; overridden by the STATS_CACHE_TTL config value
+
+stats_cache = TTLCache(ttl=STATS_CACHE_TTL, maxsize=1)
+
+_COUNTED_MODELS = {
+    'employees': Employee,
+    'payrolls': Payroll,
+    'leaves': Leave,
+    'users': User
+}
+
+
+def _count_all():
+    """Count every dashboard model in a single round trip using scalar subqueries."""
+    row = db.session.query(*[
+        select(func.count()).select_from(model).scalar_subquery().label(name)
+        for name, model in _COUNTED_MODELS.items()
+    ]).one()
+    return {name: int(getattr(row, name)) for name in _COUNTED_MODELS}
+
+
+def get_dashboard_counts(ttl=None):
+    """
+    Return {'employees', 'payrolls', 'leaves', 'users'} row counts.
+    Served from the in-process cache until the TTL expires or a change to a counted
+    model is committed.
+    """
+    return dict(stats_cache.get_or_set('counts', _count_all, ttl))
+
+
+def get_cache_stats():
+    return stats_cache.stats()
+
+
+def invalidate_counts():
+    """Drop the cached counts; bulk and Core inserts call this after they commit."""
+    stats_cache.invalidate('counts')
+
+
+_CHANGED = 'dashboard_counts_changed'
+
+
+def _mark_counts_changed(mapper, connection, target):
+    # Flush events run before commit, so the cache is only dropped once the
+    # change is visible to other sessions (see _invalidate_on_commit)
+    session = object_session(target)
+    if session is not None:
+        session.info[_CHANGED] = True
+
+
+def _invalidate_on_commit(session):
+    if session.info.pop(_CHANGED, False):
+        invalidate_counts()
+
+
+def _forget_on_rollback(session):
+    session.info.pop(_CHANGED, None)
+
+
+for _model in _COUNTED_MODELS.values():
+    event.listen(_model, 'after_insert', _mark_counts_changed)
+    event.listen(_model, 'after_delete', _mark_counts_changed)
+event.listen(Session, 'after_commit', _invalidate_on_commit)
+event.listen(Session, 'after_rollback', _forget_on_rollback)
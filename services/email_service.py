@@ -1,6 +1,10 @@
 #payroll_system/services/email_service.py
 import smtplib
 import os
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -10,42 +14,178 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of authenticated SMTP connections.
+
+    Connections are opened lazily up to `size` and handed back after each
+    message, so one STARTTLS/login handshake is amortised over many sends.
+    """
+
+    def __init__(self, connect, size=4):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            server = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(server)
+        return server
+
+    def release(self, server):
+        self._idle.put(server)
+        self._slots.release()
+
+    def discard(self, server):
+        """Drop a broken connection instead of returning it to the pool."""
+        with self._lock:
+            if server in self._all:
+                self._all.remove(server)
+        self._close(server)
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            servers, self._all = self._all, []
+        for server in servers:
+            self._close(server)
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
 class EmailService:
     def __init__(self):
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", 587))
+        self.smtp_use_tls = os.getenv("SMTP_USE_TLS", "True") == "True"
         self.sender_email = os.getenv("EMAIL_SENDER")
         self.sender_password = os.getenv("EMAIL_PASSWORD")
 
+    def _build_message(self, recipient_email, subject, message, attachment_path=None):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = recipient_email
+        msg['Subject'] = subject
+
+        # Attach message body
+        msg.attach(MIMEText(message, 'plain'))
+
+        # Attach a file if provided
+        if attachment_path:
+            with open(attachment_path, "rb") as attachment:
+                part = MIMEBase("application", "octet-stream")
+                part.set_payload(attachment.read())
+                encoders.encode_base64(part)
+                part.add_header("Content-Disposition", f"attachment; filename={os.path.basename(attachment_path)}")
+                msg.attach(part)
+        return msg
+
+    def _connect(self):
+        """Open an SMTP connection, upgrading to TLS and logging in when configured."""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        if self.smtp_use_tls:
+            server.starttls()
+        if self.sender_password:
+            server.login(self.sender_email, self.sender_password)
+        return server
+
     def send_email(self, recipient_email, subject, message, attachment_path=None):
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-            msg['Subject'] = subject
-            
-            # Attach message body
-            msg.attach(MIMEText(message, 'plain'))
-            
-            # Attach a file if provided
-            if attachment_path:
-                with open(attachment_path, "rb") as attachment:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header("Content-Disposition", f"attachment; filename={os.path.basename(attachment_path)}")
-                    msg.attach(part)
-            
+            msg = self._build_message(recipient_email, subject, message, attachment_path)
+
             # Set up the SMTP server
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
+            server = self._connect()
             server.sendmail(self.sender_email, recipient_email, msg.as_string())
             server.quit()
-            
+
             print(f"Email sent to {recipient_email}")
             return True
         except Exception as e:
             print(f"Failed to send email: {e}")
             return False
 
+    def send_bulk(self, messages, max_connections=4, max_retries=2):
+        """
+        Send many emails over a bounded pool of reused SMTP connections.
+
+        :param messages: Iterable of dicts with the send_email keyword arguments
+                         (recipient_email, subject, message, attachment_path)
+        :param max_connections: Pool size, which is also the number of worker threads
+        :param max_retries: Extra attempts per message after a transient failure
+        :return: List of per-recipient outcome dicts, in input order:
+                 {'recipient_email', 'success', 'attempts', 'error'}
+        """
+        pool = SMTPConnectionPool(self._connect, size=max_connections)
+        try:
+            with ThreadPoolExecutor(max_workers=max_connections) as executor:
+                return list(executor.map(
+                    lambda item: self._send_pooled(pool, item, max_retries), messages
+                ))
+        finally:
+            pool.close()
+
+    def _send_pooled(self, pool, item, max_retries):
+        recipient_email = item.get('recipient_email')
+        outcome = {'recipient_email': recipient_email, 'success': False, 'attempts': 0, 'error': None}
+
+        try:
+            msg = self._build_message(
+                recipient_email, item.get('subject', ''), item.get('message', ''), item.get('attachment_path')
+            ).as_string()
+        except Exception as e:
+            outcome['error'] = str(e)
+            return outcome
+
+        while outcome['attempts'] <= max_retries:
+            outcome['attempts'] += 1
+            try:
+                server = pool.acquire()
+            except Exception as e:
+                outcome['error'] = str(e)
+                continue
+
+            try:
+                server.sendmail(self.sender_email, recipient_email, msg)
+            except smtplib.SMTPRecipientsRefused as e:
+                # Permanent failure for this recipient; the connection is still fine
+                pool.release(server)
+                outcome['error'] = str(e)
+                break
+            except Exception as e:
+                # Connection may be in an unknown state; replace it and retry
+                pool.discard(server)
+                outcome['error'] = str(e)
+                logger.warning(f"Retrying email to {recipient_email} after error: {e}")
+                continue
+
+            pool.release(server)
+            outcome['success'] = True
+            outcome['error'] = None
+            break
+
+        if not outcome['success']:
+            logger.error(f"Failed to send email to {recipient_email}: {outcome['error']}")
+        return outcome
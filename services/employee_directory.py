@@ -0,0 +1,94 @@
+import json
+
+from sqlalchemy import or_
+
+from models.employee import Employee
+from services.search import like_prefix
+from app import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Only the columns the employee list shows are loaded
+LIST_COLUMNS = [
+    Employee.id,
+    (Employee.first_name + ' ' + Employee.last_name).label('name'),
+    Employee.position,
+    Employee.department,
+    Employee.salary
+]
+
+
+def clamp_page_size(limit):
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _list_query(after_id=None, search=None):
+    """
+    Projected employee rows ordered by primary key, starting after after_id.
+
+    Seeking past the last id of the previous page (instead of OFFSET) lets the
+    primary key index jump straight to the page, so every page costs the same.
+    """
+    query = db.session.query(*LIST_COLUMNS).order_by(Employee.id)
+    if after_id is not None:
+        query = query.filter(Employee.id > after_id)
+    if search:
+        prefix = like_prefix(search.strip())
+        query = query.filter(or_(
+            Employee.first_name.ilike(prefix, escape='\\'),
+            Employee.last_name.ilike(prefix, escape='\\'),
+            Employee.email.ilike(prefix, escape='\\')
+        ))
+    return query
+
+
+def employee_page(after_id=None, limit=DEFAULT_PAGE_SIZE, search=None):
+    """
+    Fetch one page of the employee list.
+
+    :param after_id: Last employee id of the previous page (None for the first page)
+    :param limit: Page size, clamped to MAX_PAGE_SIZE
+    :param search: Optional name/email prefix filter
+    :return: (rows, next_after) where next_after is None on the last page
+    """
+    limit = clamp_page_size(limit)
+    rows = _list_query(after_id, search).limit(limit + 1).all()
+    next_after = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_after
+
+
+def _row_dict(row):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'position': row.position,
+        'department': row.department,
+        'salary': row.salary
+    }
+
+
+def stream_employee_page_json(after_id=None, limit=DEFAULT_PAGE_SIZE, search=None):
+    """
+    Yield one page of the employee list as a JSON document
+    {"employees": [...], "next_after": id or null}, one row at a time.
+    """
+    limit = clamp_page_size(limit)
+    query = _list_query(after_id, search).limit(limit + 1).execution_options(
+        stream_results=True, yield_per=min(limit + 1, 100)
+    )
+
+    yield '{"employees": ['
+    last_id, count, has_more = None, 0, False
+    for row in query:
+        if count == limit:
+            has_more = True
+            break
+        yield (', ' if count else '') + json.dumps(_row_dict(row))
+        last_id = row.id
+        count += 1
+    yield '], "next_after": ' + json.dumps(last_id if has_more else None) + '}'
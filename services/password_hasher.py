@@ -0,0 +1,275 @@
+import os
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+DEFAULT_MAX_PENDING = 256
+DEFAULT_NICE = 10
+
+
+class HashPoolBusy(Exception):
+    """
+    Raised when the hashing queue is full or a hash is not done within the
+    timeout; callers should answer 503 and let the client retry.
+    """
+
+
+class PasswordHasher:
+    """
+    Password hashing and verification on a small bounded thread pool.
+
+    PBKDF2 and scrypt release the GIL while they run, so pool threads hash in
+    parallel with request threads, but never more than `workers` at a time:
+    a login storm saturates at most that many cores and queues the rest
+    instead of starving every other request. Pool threads also run at a
+    lower scheduling priority (`nice`, Linux only) so request threads win
+    the CPU when both are runnable.
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 nice=DEFAULT_NICE, timeout=30):
+        """
+        :param method: Werkzeug hash method, e.g. 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'
+        :param workers: Concurrent hash computations
+        :param max_pending: Requests allowed to wait for a worker before HashPoolBusy is raised
+        :param nice: Niceness added to pool threads (0 to disable)
+        :param timeout: Seconds a caller waits for its result
+        """
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.nice = nice
+        self.timeout = timeout
+        # Stored hashes carry the fully expanded method (default iterations included)
+        self.method_prefix = generate_password_hash('', method=method).split('$', 1)[0]
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash',
+                                            initializer=self._lower_priority)
+        # Checked in place of a missing hash so unknown accounts take as long as real ones
+        self._dummy_hash = self._executor.submit(generate_password_hash, secrets.token_hex(16), method)
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._rehashed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _lower_priority(self):
+        if self.nice and hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except OSError:
+                pass
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashPoolBusy(f"{self.workers + self.max_pending} password hash requests already queued")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def run():
+            started = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._active += 1
+                wait = started - submitted
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._run_total += time.perf_counter() - started
+                self._slots.release()
+
+        future = self._executor.submit(run)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._timed_out += 1
+            if future.cancel():
+                # Never started, so run() will not give its slot back
+                with self._lock:
+                    self._pending -= 1
+                self._slots.release()
+            raise HashPoolBusy(f"Password hash not finished within {self.timeout}s")
+
+    def hash(self, password):
+        """Hash a password with the configured method."""
+        return self._submit(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """
+        Check a password against a stored hash. An empty hash (unknown
+        account) is False, after the same work as a real check so response
+        times don't reveal which accounts exist.
+        """
+        if not stored_hash:
+            self._submit(check_password_hash, self._dummy_hash.result(), password)
+            return False
+        return self._submit(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """True if stored_hash was made with a different method or cost than configured."""
+        return stored_hash.split('$', 1)[0] != self.method_prefix
+
+    def verify_and_update(self, stored_hash, password):
+        """
+        Verify a password and, if it matches a hash made with an outdated
+        method or cost, compute its replacement.
+
+        :return: (valid, new_hash) where new_hash is None unless the caller should store it
+        """
+        if not self.verify(stored_hash, password):
+            return False, None
+        if not self.needs_rehash(stored_hash):
+            return True, None
+        new_hash = self.hash(password)
+        with self._lock:
+            self._rehashed += 1
+        return True, new_hash
+
+    def stats(self):
+        with self._lock:
+            completed = self._completed
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'queue_depth': self._pending,
+                'active': self._active,
+                'completed': completed,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+                'rehashed': self._rehashed,
+                'avg_wait_ms': self._wait_total / completed * 1000 if completed else 0.0,
+                'max_wait_ms': self._wait_max * 1000,
+                'avg_hash_ms': self._run_total / completed * 1000 if completed else 0.0
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """
+    Process-wide PasswordHasher, configured from the PASSWORD_HASH_* settings
+    of the current app (or the defaults outside an app context).
+    """
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                config = {}
+                try:
+                    from flask import current_app
+                    config = current_app.config
+                except RuntimeError:
+                    pass
+                _hasher = PasswordHasher(
+                    method=config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+                    workers=config.get('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS),
+                    max_pending=config.get('PASSWORD_HASH_MAX_PENDING', DEFAULT_MAX_PENDING),
+                    nice=config.get('PASSWORD_HASH_NICE', DEFAULT_NICE)
+                )
+    return _hasher
+
+
+if __name__ == "__main__":
+    # Load benchmark: concurrent logins against a threaded server while a
+    # probe measures latency of a cheap non-auth endpoint.
+    import json
+    import urllib.request
+    from flask import Flask, jsonify, request
+    from werkzeug.serving import make_server
+
+    LOGIN_CLIENTS = 32
+    DURATION = 8.0
+    method = 'pbkdf2:sha256:200000'
+    stored = generate_password_hash('correct horse', method=method)
+    hasher = PasswordHasher(method=method, workers=DEFAULT_WORKERS, max_pending=LOGIN_CLIENTS)
+    mode = {'pooled': False}
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    def ping():
+        return jsonify({'ok': True, 'total': sum(range(1000))})
+
+    @app.route('/login', methods=['POST'])
+    def login():
+        password = request.get_data(as_text=True)
+        valid = hasher.verify(stored, password) if mode['pooled'] else check_password_hash(stored, password)
+        return jsonify({'valid': valid})
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    base = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def scenario(logins, pooled):
+        mode['pooled'] = pooled
+        stop = threading.Event()
+        login_count = [0]
+
+        def login_client():
+            while not stop.is_set():
+                urllib.request.urlopen(urllib.request.Request(f"{base}/login", data=b'correct horse')).read()
+                login_count[0] += 1
+
+        clients = [threading.Thread(target=login_client) for _ in range(logins)]
+        for client in clients:
+            client.start()
+        time.sleep(0.5)
+
+        latencies = []
+        deadline = time.perf_counter() + DURATION
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            json.loads(urllib.request.urlopen(f"{base}/ping").read())
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+        stop.set()
+        for client in clients:
+            client.join()
+        latencies.sort()
+        return {
+            'p50_ms': latencies[len(latencies) // 2],
+            'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+            'logins_per_sec': login_count[0] / (DURATION + 0.5)
+        }
+
+    print(f"{os.cpu_count()} CPUs, {method}, {LOGIN_CLIENTS} concurrent login clients, "
+          f"{DEFAULT_WORKERS} hash worker(s)")
+    for name, logins, pooled in (('idle', 0, False), ('inline hashing', LOGIN_CLIENTS, False),
+                                 ('pooled hashing', LOGIN_CLIENTS, True)):
+        result = scenario(logins, pooled)
+        print(f"{name:>15}: /ping p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+              f"{result['logins_per_sec']:.1f} logins/sec")
+    print(f"pool stats: {hasher.stats()}")
+    server.shutdown()
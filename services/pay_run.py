@@ -0,0 +1,265 @@
+import os
+import logging
+from datetime import datetime
+
+import numpy as np
+from celery import shared_task
+from sqlalchemy import case, func
+
+from models.employee import Employee
+from models.attendance import Attendance
+from models.payroll import Payroll, PayRun, apply_rollup_deltas, rollup_deltas
+from services.salary_calculator import SalaryCalculator
+from services.payroll_records import PayrollBatch
+from services.tax_rules import get_tax_rules
+from services.periods import period_bounds, within_period
+from services.pdf_service import generate_payslip
+from services.email_service import EmailService
+from services.dashboard_stats import invalidate_counts
+from app import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+PAYSLIP_DIR = os.getenv('PAYSLIP_DIR', os.path.join('output', 'pay_runs'))
+NOTIFY_SMTP_CONNECTIONS = int(os.getenv('PAY_RUN_SMTP_CONNECTIONS', 4))
+
+# Same assumptions as PayrollAgent.optimize_payroll_process
+WORKING_DAYS_PER_MONTH = 22
+HOURS_PER_DAY = 8
+OVERTIME_MULTIPLIER = 1.5
+
+
+def create_pay_run(period_start, period_end, payment_date=None, company_id=None, batch_size=DEFAULT_BATCH_SIZE,
+                   render_payslips=True, send_notifications=True, created_by=None):
+    """
+    Record a pending pay run; start it with plan_pay_run.delay(run.id).
+
+    :param period_start: First day of the pay period
+    :param period_end: Last day of the pay period (inclusive)
+    :param payment_date: Date the payrolls are paid on (default: period_end)
+    :param company_id: Limit the run to one company's employees
+    :param batch_size: Employees per batch task
+    """
+    period_bounds(period_start, period_end)  # validates the order
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    run = PayRun(
+        company_id=company_id,
+        period_start=period_start,
+        period_end=period_end,
+        payment_date=payment_date or period_end,
+        status='pending',
+        batch_size=batch_size,
+        render_payslips=render_payslips,
+        send_notifications=send_notifications,
+        created_by=created_by
+    )
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+
+@shared_task(name='pay_run.plan')
+def plan_pay_run(run_id):
+    """Split the run's employees into batches and fan the batches out to workers."""
+    run = db.session.get(PayRun, run_id)
+    if run is None or run.status != 'pending':
+        return 0
+
+    query = db.session.query(Employee.id).order_by(Employee.id)
+    if run.company_id is not None:
+        query = query.filter(Employee.company_id == run.company_id)
+    employee_ids = [row.id for row in query]
+    batches = [employee_ids[i:i + run.batch_size] for i in range(0, len(employee_ids), run.batch_size)]
+
+    run.total_employees = len(employee_ids)
+    run.total_batches = len(batches)
+    run.status = 'running'
+    run.started_at = datetime.utcnow()
+    db.session.commit()
+    logger.info(f"Pay run {run_id}: {len(employee_ids)} employees in {len(batches)} batches")
+
+    if not batches:
+        _finish_if_done(run_id)
+    for batch in batches:
+        process_pay_run_batch.delay(run_id, batch)
+    return len(batches)
+
+
+@shared_task(name='pay_run.process_batch', bind=True, max_retries=2, default_retry_delay=30)
+def process_pay_run_batch(self, run_id, employee_ids):
+    """
+    Compute, persist, render and notify one batch of a pay run.
+
+    Persisting skips employees that already have a payroll in this run, so a
+    retried batch does not create duplicates.
+    """
+    run = db.session.get(PayRun, run_id)
+    if run is None or run.status != 'running':
+        return 0
+
+    try:
+        batch, employees = compute_batch(run, employee_ids)
+        persist_batch(run, batch, employees)
+        payslips = render_batch(run, batch, employees) if run.render_payslips else {}
+    except Exception as e:
+        db.session.rollback()
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Pay run {run_id}: retrying batch after error: {e}")
+            raise self.retry(exc=e)
+        logger.error(f"Pay run {run_id}: batch of {len(employee_ids)} employees failed: {e}")
+        _advance(run_id, error=str(e), failed_batches=1)
+        return 0
+
+    # Delivery failures are reported per recipient and never fail the batch
+    sent = notify_batch(run, batch, employees, payslips) if run.send_notifications else 0
+    _advance(run_id, completed_batches=1, processed_employees=len(batch),
+             payslips_rendered=len(payslips), notifications_sent=sent)
+    return len(batch)
+
+
+def compute_batch(run, employee_ids):
+    """
+    Payrolls for a batch of employees, computed in one vectorized pass.
+
+    :return: (PayrollBatch rounded to cents, mapping of employee id -> employee row)
+    """
+    employees = {
+        row.id: row for row in db.session.query(
+            Employee.id, Employee.first_name, Employee.last_name, Employee.email,
+            Employee.department, Employee.salary, Employee.company_id
+        ).filter(Employee.id.in_(employee_ids)).order_by(Employee.id)
+    }
+    ids = list(employees)
+
+    start, end = period_bounds(run.period_start, run.period_end)
+    overtime = dict(db.session.query(
+        Attendance.employee_id,
+        func.coalesce(func.sum(Attendance.overtime_hours), 0.0)
+    ).filter(
+        Attendance.employee_id.in_(ids),
+        within_period(Attendance.date, start, end)
+    ).group_by(
+        Attendance.employee_id
+    ).all())
+
+    basic_salary = np.array([employees[i].salary or 0.0 for i in ids], dtype=np.float64)
+    overtime_hours = np.array([overtime.get(i, 0.0) for i in ids], dtype=np.float64)
+    overtime_rate = basic_salary / (WORKING_DAYS_PER_MONTH * HOURS_PER_DAY) * OVERTIME_MULTIPLIER
+
+    # Monthly withholding from the annualized gross
+    rules = get_tax_rules()
+    annual = (basic_salary + SalaryCalculator.calculate_overtime(overtime_hours, overtime_rate)) * 12
+    batch = PayrollBatch(
+        ids,
+        [run.company_id if run.company_id is not None else employees[i].company_id for i in ids],
+        basic_salary=basic_salary,
+        overtime_hours=overtime_hours,
+        overtime_rate=overtime_rate,
+        tax_deduction=rules.income_tax_many(annual) / 12,
+        insurance_deduction=(rules.social_security_tax_many(annual) + rules.medicare_tax_many(annual)) / 12
+    )
+    return SalaryCalculator.process_payroll_batch(batch).rounded(), employees
+
+
+def persist_batch(run, batch, employees):
+    """Bulk-insert the batch's new payroll rows and fold them into the monthly rollup."""
+    existing = {
+        employee_id for employee_id, in db.session.query(Payroll.employee_id).filter(
+            Payroll.pay_run_id == run.id,
+            Payroll.employee_id.in_(batch['employee_id'].tolist())
+        )
+    }
+    # Row dicts exist only for this insert
+    new_rows = batch.payroll_rows(
+        skip_employee_ids=existing, pay_run_id=run.id, payment_date=run.payment_date,
+        payment_status='pending', created_at=datetime.utcnow()
+    )
+    if new_rows:
+        # Core inserts skip the Payroll flush events, so the rollup is updated here
+        db.session.execute(Payroll.__table__.insert(), new_rows)
+        departments = {employee_id: employee.department for employee_id, employee in employees.items()}
+        apply_rollup_deltas(db.session.connection(), rollup_deltas(new_rows, departments))
+    db.session.commit()
+    if new_rows:
+        invalidate_counts()  # Core inserts skip the dashboard count events too
+    return len(new_rows)
+
+
+def _payslip_path(run, employee_id):
+    return os.path.join(PAYSLIP_DIR, f"run_{run.id}", f"payslip_{employee_id}.pdf")
+
+
+def render_batch(run, batch, employees):
+    """Render one payslip PDF per payroll; returns employee id -> file path."""
+    paths = {}
+    for record in batch.records():
+        employee = employees[record.employee_id]
+        paths[record.employee_id] = generate_payslip(
+            f"{employee.first_name} {employee.last_name}",
+            record.basic_salary, record.total_deductions, record.net_salary,
+            _payslip_path(run, record.employee_id)
+        )
+    return paths
+
+
+def notify_batch(run, batch, employees, payslips):
+    """Email each employee in the batch over pooled SMTP connections; returns the number sent."""
+    period = f"{run.period_start:%d %b %Y} - {run.period_end:%d %b %Y}"
+    messages = [{
+        'recipient_email': employees[record.employee_id].email,
+        'subject': "Your payslip is ready",
+        'message': (f"Dear {employees[record.employee_id].first_name}, your payroll for {period} "
+                    f"has been processed. Net pay: ${record.net_salary:.2f}."),
+        'attachment_path': payslips.get(record.employee_id)
+    } for record in batch.records() if employees[record.employee_id].email]
+    if not messages:
+        return 0
+
+    outcomes = EmailService().send_bulk(messages, max_connections=NOTIFY_SMTP_CONNECTIONS)
+    return sum(1 for outcome in outcomes if outcome['success'])
+
+
+def _advance(run_id, error=None, **increments):
+    """Atomically add to the run's progress counters, then close the run if every batch is done."""
+    table = PayRun.__table__
+    values = {name: getattr(table.c, name) + amount for name, amount in increments.items()}
+    if error is not None:
+        values['error'] = error
+    db.session.execute(table.update().where(table.c.id == run_id).values(**values))
+    db.session.commit()
+    _finish_if_done(run_id)
+
+
+def _finish_if_done(run_id):
+    # Conditional on status, so only one of the batches finishing together closes the run
+    table = PayRun.__table__
+    db.session.execute(table.update().where(
+        table.c.id == run_id,
+        table.c.status == 'running',
+        table.c.completed_batches + table.c.failed_batches >= table.c.total_batches
+    ).values(
+        status=case((table.c.failed_batches > 0, 'failed'), else_='completed'),
+        finished_at=datetime.utcnow()
+    ))
+    db.session.commit()
+
+
+@shared_task(name='pay_run.notify_payroll_approved')
+def notify_payroll_approved(payroll_id):
+    """Email an employee that their payroll was approved."""
+    payroll = db.session.get(Payroll, payroll_id)
+    if payroll is None:
+        return False
+    employee = Employee.query.filter_by(id=payroll.employee_id).first()
+    if employee is None or not employee.email:
+        return False
+
+    period = f"{payroll.payment_date:%B %Y}" if payroll.payment_date else "this period"
+    return EmailService().send_email(
+        employee.email,
+        "Payroll Approved",
+        f"Dear {employee.full_name}, your payroll for {period} has been approved."
+    )
@@ -0,0 +1,143 @@
+import csv
+import io
+
+from models.payroll import Payroll
+from app import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+# (header, column) pairs written by every export format
+EXPORT_COLUMNS = [
+    ('Payroll ID', Payroll.id),
+    ('Employee ID', Payroll.employee_id),
+    ('Basic Salary', Payroll.basic_salary),
+    ('Bonus', Payroll.bonuses),
+    ('Deductions', Payroll.deductions),
+    ('Net Salary', Payroll.net_salary),
+    ('Created At', Payroll.created_at)
+]
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def parquet_available():
+    return pq is not None
+
+
+def iter_payroll_rows(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield lists of payroll row tuples, chunk_size rows at a time.
+
+    Only the exported columns are selected, and rows are fetched through a
+    server-side cursor, so memory stays bounded by one chunk regardless of
+    table size.
+    """
+    query = db.session.query(
+        *[column for _, column in EXPORT_COLUMNS]
+    ).order_by(
+        Payroll.id
+    ).execution_options(
+        stream_results=True, yield_per=chunk_size
+    )
+
+    chunk = []
+    for row in query:
+        chunk.append(tuple(row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_payroll_csv(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the payroll export as CSV text, one encoded chunk per batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    for chunk in iter_payroll_rows(chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_payroll_parquet(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the payroll export as a Parquet file, one row group per batch of rows.
+
+    The Parquet writer targets an in-memory sink that is drained after every
+    row group, so no temporary file is written and memory stays bounded.
+    :raises RuntimeError: If pyarrow is not installed
+    """
+    if not parquet_available():
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    headers = [header for header, _ in EXPORT_COLUMNS]
+    schema = pa.schema([
+        ('Payroll ID', pa.int64()),
+        ('Employee ID', pa.int64()),
+        ('Basic Salary', pa.float64()),
+        ('Bonus', pa.float64()),
+        ('Deductions', pa.float64()),
+        ('Net Salary', pa.float64()),
+        ('Created At', pa.timestamp('us'))
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in iter_payroll_rows(chunk_size):
+            columns = list(zip(*chunk))
+            batch = pa.record_batch(
+                [pa.array(columns[i], type=schema.field(i).type) for i in range(len(headers))],
+                schema=schema
+            )
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+
+    data = sink.drain()
+    if data:
+        yield data
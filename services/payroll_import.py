@@ -0,0 +1,324 @@
+import json
+import logging
+import math
+import time
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.employee import Employee
+from models.payroll import Payroll, PayrollBenefit, PayrollOtherDeduction, apply_rollup_deltas, rollup_deltas
+from services.dashboard_stats import invalidate_counts
+from app import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+PAYMENT_STATUSES = ('pending', 'approved', 'paid', 'cancelled')
+AMOUNT_FIELDS = ('basic_salary', 'bonuses', 'deductions', 'gross_salary', 'tax_deduction', 'net_salary')
+MAX_REPORTED_ERRORS = 1000
+INT64_LIMIT = 2 ** 63
+
+
+def iter_ndjson(lines):
+    """
+    Parse newline-delimited JSON, yielding one entry per non-blank line.
+    Lines that are not JSON objects are yielded as _InvalidEntry so they are
+    reported as row errors by import_payrolls instead of aborting the import.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            yield _InvalidEntry(f"Invalid JSON: {e}")
+            continue
+        yield entry if isinstance(entry, dict) else _InvalidEntry("Entry is not a JSON object")
+
+
+class _InvalidEntry:
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def import_payrolls(entries, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate and bulk-insert payroll entries, chunk_size rows per transaction.
+
+    Each entry is a dict with employee_id and basic_salary, and optionally
+    bonuses, deductions, gross_salary (default basic_salary + bonuses),
+    tax_deduction, net_salary (default gross - deductions - tax), payment_date
+    (YYYY-MM-DD), payment_status, company_id (default: the employee's),
+    benefits [{'benefit_type', 'amount'}] and other_deductions [{'amount'}].
+
+    Invalid rows are reported and skipped; the rest of the batch is inserted.
+
+    :param entries: Iterable of entry dicts (consumed one chunk at a time)
+    :return: Dict with 'received', 'inserted', 'failed', 'errors' (list of
+             {'index', 'errors'}, capped at MAX_REPORTED_ERRORS) and 'seconds'
+    """
+    started = time.perf_counter()
+    summary = {'received': 0, 'inserted': 0, 'failed': 0, 'errors': []}
+
+    iterator = iter(entries)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        offset = summary['received']
+        summary['received'] += len(chunk)
+
+        rows, children, errors = validate_payroll_entries(chunk, offset)
+        if rows:
+            inserted, insert_errors = _insert_chunk(rows, children)
+            summary['inserted'] += inserted
+            errors.extend(insert_errors)
+            if inserted:
+                # Bulk inserts skip the flush events that keep the dashboard counts fresh
+                invalidate_counts()
+
+        summary['failed'] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(summary['errors'])
+        summary['errors'].extend(sorted(errors, key=lambda e: e['index'])[:max(room, 0)])
+
+    summary['seconds'] = time.perf_counter() - started
+    logger.info(f"Payroll import: {summary['inserted']} inserted, {summary['failed']} failed "
+                f"in {summary['seconds']:.2f}s")
+    return summary
+
+
+def validate_payroll_entries(entries, offset=0):
+    """
+    Validate a chunk of entries column-wise.
+
+    :param offset: Index of entries[0] in the whole import, used in error reports
+    :return: (payroll row dicts, per-row (benefits, other_deductions) lists,
+              list of {'index', 'errors'} for rejected entries)
+    """
+    n = len(entries)
+    problems = [[] for _ in range(n)]
+    records = []
+    unparsed = np.zeros(n, dtype=bool)
+    for i, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            records.append(entry)
+            continue
+        problems[i].append(entry.error if isinstance(entry, _InvalidEntry) else "Entry is not an object")
+        unparsed[i] = True
+        records.append({})
+
+    frame = pd.DataFrame.from_records(records, index=range(n), columns=[
+        'employee_id', 'company_id', *AMOUNT_FIELDS, 'payment_date', 'payment_status'
+    ])
+
+    def reject(mask, message):
+        for i in np.flatnonzero(np.asarray(mask) & ~unparsed):
+            problems[i].append(message)
+
+    employee_ids = _integer_ids(frame['employee_id'])
+    reject(employee_ids.isna(), "employee_id must be an integer")
+    employees = _employee_lookup(employee_ids.dropna().astype('int64').unique().tolist())
+    reject(employee_ids.notna() & ~employee_ids.isin(list(employees)), "Unknown employee_id")
+
+    company_ids = _integer_ids(frame['company_id'])
+    reject(frame['company_id'].notna() & company_ids.isna(), "company_id must be an integer")
+
+    amounts = {}
+    for field in AMOUNT_FIELDS:
+        raw = frame[field]
+        values = _to_numeric(raw)
+        present, finite = raw.notna(), np.isfinite(values)
+        reject(present & ~finite, f"{field} must be a finite number")
+        reject(finite & (values < 0), f"{field} must not be negative")
+        amounts[field] = values.where(finite)
+    reject(frame['basic_salary'].isna(), "basic_salary is required")
+
+    basic = amounts['basic_salary'].fillna(0.0)
+    bonuses = amounts['bonuses'].fillna(0.0)
+    deductions = amounts['deductions'].fillna(0.0)
+    tax = amounts['tax_deduction'].fillna(0.0)
+    gross = amounts['gross_salary'].fillna(basic + bonuses)
+    net = amounts['net_salary'].fillna(gross - deductions - tax)
+    reject((net < 0) & amounts['basic_salary'].notna(), "net_salary would be negative")
+    reject(~np.isfinite(gross) | ~np.isfinite(net), "Amounts are out of range")
+
+    payment_dates = pd.to_datetime(frame['payment_date'], format='%Y-%m-%d', errors='coerce')
+    reject(frame['payment_date'].notna() & payment_dates.isna(), "payment_date must be YYYY-MM-DD")
+
+    status = frame['payment_status'].fillna('pending')
+    reject(~status.isin(PAYMENT_STATUSES), f"payment_status must be one of {', '.join(PAYMENT_STATUSES)}")
+
+    children = [_child_rows(record, problems[i]) for i, record in enumerate(records)]
+
+    # Plain lists for the row loop; Series element access is far slower
+    columns = {
+        'employee_id': employee_ids.tolist(),
+        'company_id': company_ids.tolist(),
+        'basic_salary': basic.tolist(),
+        'bonuses': bonuses.tolist(),
+        'deductions': deductions.tolist(),
+        'gross_salary': gross.tolist(),
+        'tax_deduction': tax.tolist(),
+        'net_salary': net.tolist(),
+        'payment_date': [None if pd.isna(value) else value.date() for value in payment_dates],
+        'payment_status': status.tolist()
+    }
+
+    rows, row_children, errors = [], [], []
+    for i in range(n):
+        if problems[i]:
+            errors.append({'index': offset + i, 'errors': problems[i]})
+            continue
+        row = {name: values[i] for name, values in columns.items()}
+        employee_id = row['employee_id'] = int(row['employee_id'])
+        department, employee_company_id = employees[employee_id]
+        row['company_id'] = employee_company_id if pd.isna(row['company_id']) else int(row['company_id'])
+        row['_index'] = offset + i
+        row['_department'] = department
+        rows.append(row)
+        row_children.append(children[i])
+    return rows, row_children, errors
+
+
+def _integer_ids(raw):
+    """
+    Parse an id column; anything that is not a whole number in int64 range
+    (non-numeric, fractional, inf, 1e30, ...) becomes NaN so the caller
+    rejects the row instead of failing or wrapping on the int64 cast.
+    """
+    values = _to_numeric(raw).astype('float64')
+    valid = np.isfinite(values) & (values % 1 == 0) & (values >= -INT64_LIMIT) & (values < INT64_LIMIT)
+    return values.where(valid)
+
+
+def _to_numeric(raw):
+    """
+    pd.to_numeric with unparseable values as NaN. JSON true/false would
+    otherwise read as 1/0, so booleans are rejected like in _child_rows.
+    """
+    if raw.dtype == object or raw.dtype == bool:
+        raw = raw.mask(raw.map(lambda value: isinstance(value, (bool, np.bool_))))
+    return pd.to_numeric(raw, errors='coerce')
+
+
+def _child_rows(record, problems):
+    """Validate an entry's benefits and other_deductions lists"""
+    result = []
+    for field, required in (('benefits', ('benefit_type', 'amount')), ('other_deductions', ('amount',))):
+        items = record.get(field)
+        if items is None:
+            items = []
+        if not isinstance(items, list):
+            problems.append(f"{field} must be a list")
+            result.append([])
+            continue
+        valid = []
+        for item in items:
+            if not isinstance(item, dict) or any(item.get(key) is None for key in required):
+                problems.append(f"Each {field} item needs {', '.join(required)}")
+                break
+            amount = item['amount']
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount) \
+                    or amount < 0:
+                problems.append(f"{field} amount must be a finite, non-negative number")
+                break
+            valid.append({key: item[key] for key in required})
+        result.append(valid)
+    return tuple(result)
+
+
+def _employee_lookup(employee_ids):
+    """Map employee id -> (department, company_id) for the ids that exist"""
+    if not employee_ids:
+        return {}
+    rows = db.session.query(Employee.id, Employee.department, Employee.company_id).filter(
+        Employee.id.in_(employee_ids)
+    ).all()
+    return {row.id: (row.department, row.company_id) for row in rows}
+
+
+def _insert_chunk(rows, children):
+    """Insert one validated chunk in a single transaction, isolating bad rows if it fails."""
+    try:
+        _bulk_insert(rows, children)
+        db.session.commit()
+        return len(rows), []
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.warning(f"Bulk payroll insert failed ({e.__class__.__name__}), retrying the chunk row by row")
+
+    inserted, errors = 0, []
+    for row, row_children in zip(rows, children):
+        try:
+            _bulk_insert([row], [row_children])
+            db.session.commit()
+            inserted += 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            errors.append({'index': row['_index'], 'errors': [str(e.orig if hasattr(e, 'orig') else e)]})
+    return inserted, errors
+
+
+def _bulk_insert(rows, children):
+    payrolls = [{k: v for k, v in row.items() if not k.startswith('_')} for row in rows]
+    has_children = any(benefits or others for benefits, others in children)
+
+    # Generated ids are only fetched when child rows need them
+    db.session.bulk_insert_mappings(Payroll, payrolls, return_defaults=has_children)
+
+    if has_children:
+        benefits, others = [], []
+        for payroll, (row_benefits, row_others) in zip(payrolls, children):
+            benefits.extend(dict(item, payroll_id=payroll['id']) for item in row_benefits)
+            others.extend(dict(item, payroll_id=payroll['id']) for item in row_others)
+        if benefits:
+            db.session.bulk_insert_mappings(PayrollBenefit, benefits)
+        if others:
+            db.session.bulk_insert_mappings(PayrollOtherDeduction, others)
+
+    # Bulk inserts skip the Payroll flush events, so the monthly rollup is updated here
+    departments = {row['employee_id']: row['_department'] for row in rows}
+    apply_rollup_deltas(db.session.connection(), rollup_deltas(payrolls, departments))
+
+
+if __name__ == "__main__":
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Employee.__table__.insert(), [
+            {'id': i, 'employee_id': i, 'first_name': 'Bulk', 'last_name': str(i), 'email': f'bulk{i}@example.com',
+             'hire_date': pd.Timestamp('2020-01-01').date(), 'position': 'Engineer', 'department': 'Engineering',
+             'salary': 5000.0}
+            for i in range(1, 1001)
+        ])
+        db.session.commit()
+
+        rng = np.random.default_rng(0)
+        entries = [{
+            'employee_id': int(rng.integers(1, 1001)),
+            'basic_salary': round(float(rng.uniform(2000, 9000)), 2),
+            'bonuses': 100.0,
+            'tax_deduction': 400.0,
+            'payment_date': '2024-05-31',
+            'payment_status': 'paid',
+            'benefits': [{'benefit_type': 'health', 'amount': 50.0}] if i % 4 == 0 else []
+        } for i in range(100000)]
+        entries[10]['basic_salary'] = 'abc'
+        entries[20]['employee_id'] = 99999
+
+        result = import_payrolls(entries)
+        print(f"{result['inserted']} inserted, {result['failed']} failed in {result['seconds']:.2f}s; "
+              f"first errors: {result['errors'][:2]}")
@@ -0,0 +1,256 @@
+import numpy as np
+
+# Amount fields of a payroll record: SalaryCalculator inputs, then its outputs
+AMOUNT_FIELDS = (
+    'basic_salary', 'overtime_hours', 'overtime_rate', 'allowances', 'bonuses',
+    'tax_deduction', 'insurance_deduction', 'other_deductions',
+    'overtime_amount', 'gross_salary', 'total_deductions', 'net_salary'
+)
+FIELDS = ('employee_id', 'company_id') + AMOUNT_FIELDS
+
+# Payroll table column -> record field, used when rows are written
+PAYROLL_COLUMNS = {
+    'basic_salary': 'basic_salary',
+    'bonuses': 'bonuses',
+    'deductions': 'total_deductions',
+    'gross_salary': 'gross_salary',
+    'tax_deduction': 'tax_deduction',
+    'net_salary': 'net_salary'
+}
+
+NO_COMPANY = -1  # company_id column value for records without a company
+
+
+class PayrollRecord:
+    """
+    One employee's payroll for a pay run: ids plus the amounts SalaryCalculator
+    reads and writes. Immutable and slotted, so a record costs a fraction of a
+    dict or an ORM instance; use replace() to derive an updated copy.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, employee_id, company_id=None, **amounts):
+        set_field = object.__setattr__
+        set_field(self, 'employee_id', employee_id)
+        set_field(self, 'company_id', company_id)
+        for name in AMOUNT_FIELDS:
+            set_field(self, name, float(amounts.pop(name, 0.0)))
+        if amounts:
+            raise TypeError(f"Unknown payroll record fields: {', '.join(sorted(amounts))}")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PayrollRecord is immutable; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("PayrollRecord is immutable")
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in FIELDS}
+        values.update(changes)
+        return PayrollRecord(**values)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, PayrollRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'<PayrollRecord employee={self.employee_id} net={self.net_salary:.2f}>'
+
+
+class PayrollBatch:
+    """
+    A pay run's payrolls as struct-of-arrays: one numpy column per field
+    (int64 ids, float64 amounts) instead of one object per employee.
+
+    batch[field] is that field's array, which is how
+    SalaryCalculator.process_payroll_batch reads its inputs; len(batch) is the
+    number of payrolls, and record(i) and records() give PayrollRecord views
+    where code needs a row. Columns are read-only and with_columns() returns
+    a new batch.
+    """
+    __slots__ = ('_columns',)
+
+    def __init__(self, employee_ids, company_ids=None, **amounts):
+        """
+        :param employee_ids: Sequence of employee ids
+        :param company_ids: Sequence of company ids (None entries allowed), or None for no company
+        :param amounts: Any of AMOUNT_FIELDS as sequences of the same length (missing ones are zero)
+        """
+        employee_ids = np.asarray(employee_ids, dtype=np.int64)
+        n = len(employee_ids)
+        if company_ids is None:
+            company_ids = np.full(n, NO_COMPANY, dtype=np.int64)
+        else:
+            company_ids = np.array([NO_COMPANY if c is None else c for c in company_ids], dtype=np.int64)
+
+        columns = {'employee_id': employee_ids, 'company_id': company_ids}
+        for name in AMOUNT_FIELDS:
+            values = amounts.pop(name, None)
+            columns[name] = np.zeros(n) if values is None else np.asarray(values, dtype=np.float64)
+        if amounts:
+            raise TypeError(f"Unknown payroll batch columns: {', '.join(sorted(amounts))}")
+        self._columns = _freeze(columns, n)
+
+    @classmethod
+    def _from_columns(cls, columns):
+        batch = cls.__new__(cls)
+        batch._columns = columns
+        return batch
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        return cls(
+            [record.employee_id for record in records],
+            [record.company_id for record in records],
+            **{name: [getattr(record, name) for record in records] for name in AMOUNT_FIELDS}
+        )
+
+    @classmethod
+    def from_payrolls(cls, payrolls):
+        """Read Payroll rows (ORM instances or projected rows) at a persistence boundary."""
+        payrolls = list(payrolls)
+        return cls(
+            [payroll.employee_id for payroll in payrolls],
+            [payroll.company_id for payroll in payrolls],
+            **{field: [getattr(payroll, column) or 0.0 for payroll in payrolls]
+               for column, field in PAYROLL_COLUMNS.items()}
+        )
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def keys(self):
+        return self._columns.keys()
+
+    def __len__(self):
+        return len(self._columns['employee_id'])
+
+    def with_columns(self, **arrays):
+        """New batch sharing the unchanged columns, with the given ones replaced."""
+        unknown = set(arrays) - set(AMOUNT_FIELDS)
+        if unknown:
+            raise KeyError(f"Unknown payroll batch columns: {', '.join(sorted(unknown))}")
+        columns = dict(self._columns)
+        columns.update({name: np.asarray(values, dtype=np.float64) for name, values in arrays.items()})
+        return self._from_columns(_freeze(columns, len(self)))
+
+    def rounded(self, decimals=2):
+        """Amounts rounded to cents, as stored"""
+        return self.with_columns(**{name: np.round(self._columns[name], decimals) for name in AMOUNT_FIELDS})
+
+    def record(self, i):
+        company_id = int(self._columns['company_id'][i])
+        return PayrollRecord(
+            int(self._columns['employee_id'][i]),
+            None if company_id == NO_COMPANY else company_id,
+            **{name: self._columns[name][i] for name in AMOUNT_FIELDS}
+        )
+
+    def records(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def payroll_rows(self, skip_employee_ids=(), **values):
+        """
+        Payroll column dicts for a core or bulk insert, the write boundary.
+
+        :param skip_employee_ids: Employees to leave out (e.g. already persisted)
+        :param values: Column values shared by every row (pay_run_id, payment_date, ...)
+        """
+        employee_ids = self._columns['employee_id'].tolist()
+        company_ids = self._columns['company_id'].tolist()
+        amounts = {column: self._columns[field].tolist() for column, field in PAYROLL_COLUMNS.items()}
+        skip = set(skip_employee_ids)
+
+        rows = []
+        for i, employee_id in enumerate(employee_ids):
+            if employee_id in skip:
+                continue
+            row = dict(values, employee_id=employee_id,
+                       company_id=None if company_ids[i] == NO_COMPANY else company_ids[i])
+            for column, column_values in amounts.items():
+                row[column] = column_values[i]
+            rows.append(row)
+        return rows
+
+
+def _freeze(columns, n):
+    """Read-only views of the columns; the caller's own arrays stay writable"""
+    frozen = {}
+    for name, values in columns.items():
+        if len(values) != n:
+            raise ValueError(f"Column {name} has {len(values)} values, expected {n}")
+        frozen[name] = values.view()
+        frozen[name].flags.writeable = False
+    return frozen
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    from datetime import date, datetime
+
+    # The calculator checks for the importable classes, not this __main__ copy
+    from services.payroll_records import PayrollBatch, PayrollRecord
+    from services.salary_calculator import SalaryCalculator
+
+    # Peak memory of computing a 100k-employee pay run in each representation
+    n = 100000
+    rng = np.random.default_rng(42)
+    inputs = {
+        'basic_salary': rng.uniform(2000, 12000, n).round(2),
+        'overtime_hours': rng.uniform(0, 20, n).round(1),
+        'overtime_rate': rng.uniform(15, 60, n).round(2),
+        'tax_deduction': rng.uniform(200, 3000, n).round(2),
+        'insurance_deduction': rng.uniform(0, 400, n).round(2)
+    }
+    employee_ids = list(range(1, n + 1))
+    company_ids = [i % 50 + 1 for i in employee_ids]
+    payment_date, created_at = date(2024, 5, 31), datetime(2024, 5, 31)
+
+    def dict_rows():
+        # One dict per employee, as pay runs built before this module
+        result = SalaryCalculator.process_payroll_batch(dict(
+            inputs, allowances=np.zeros(n), bonuses=np.zeros(n), other_deductions=np.zeros(n)
+        ))
+        basic = inputs['basic_salary']
+        deductions, gross = np.round(result['total_deductions'], 2), np.round(result['gross_salary'], 2)
+        tax, net = np.round(result['tax_deduction'], 2), np.round(result['net_salary'], 2)
+        return [{
+            'employee_id': employee_id, 'company_id': company_ids[i], 'pay_run_id': 1,
+            'basic_salary': float(basic[i]), 'bonuses': 0.0, 'deductions': float(deductions[i]),
+            'gross_salary': float(gross[i]), 'tax_deduction': float(tax[i]), 'net_salary': float(net[i]),
+            'payment_date': payment_date, 'payment_status': 'pending', 'created_at': created_at
+        } for i, employee_id in enumerate(employee_ids)]
+
+    def slotted_records():
+        columns = {name: values.tolist() for name, values in inputs.items()}
+        return [SalaryCalculator.process_record(PayrollRecord(
+            employee_id, company_ids[i], **{name: values[i] for name, values in columns.items()}
+        )) for i, employee_id in enumerate(employee_ids)]
+
+    def batch():
+        return SalaryCalculator.process_payroll_batch(PayrollBatch(employee_ids, company_ids, **inputs)).rounded()
+
+    for name, build in (('dict per employee', dict_rows), ('PayrollRecord list', slotted_records),
+                        ('PayrollBatch', batch)):
+        started = time.perf_counter()
+        build()
+        seconds = time.perf_counter() - started  # timed without tracemalloc's overhead
+
+        tracemalloc.start()
+        result = build()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        print(f"{name:>18}: peak {peak / 2 ** 20:7.1f} MiB, {peak / n:6.0f} bytes/employee, {seconds:.2f}s")
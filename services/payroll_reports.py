@@ -0,0 +1,410 @@
+import csv
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from celery import shared_task
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+
+from models.employee import Employee
+from models.payroll import Payroll, PayrollReport, PayrollReportBuild
+from services.periods import month_bounds, period_bounds, within_period
+from app import db
+
+logger = logging.getLogger(__name__)
+
+REPORT_TYPES = ('monthly', 'employee')
+REPORT_FORMATS = {'pdf': 'application/pdf', 'csv': 'text/csv'}
+REPORT_STORE_DIR = os.getenv('REPORT_STORE_DIR', os.path.join('output', 'reports'))
+
+AMOUNT_HEADERS = ['Payrolls', 'Gross', 'Bonuses', 'Deductions', 'Tax', 'Net']
+PDF_LINES_PER_PAGE = 48
+
+
+def month_range(start_date, end_date):
+    """
+    Half-open range of whole calendar months covering an inclusive date range;
+    report periods are always whole months.
+
+    :return: (first day of start_date's month, first day of the month after end_date)
+    """
+    start, end = period_bounds(start_date, end_date)
+    last = end - timedelta(days=1)
+    return start.replace(day=1), month_bounds(last.year, last.month)[1]
+
+
+def artifact_path(digest, file_format, store_dir=None):
+    """Location of a stored artifact; the first two hex digits shard the directory."""
+    return os.path.join(store_dir or REPORT_STORE_DIR, digest[:2], f"{digest}.{file_format}")
+
+
+def store_artifact(data, file_format, store_dir=None):
+    """
+    Write bytes to content-addressed storage unless an identical artifact is
+    already there. Written to a temporary file and renamed into place, so
+    readers never see a partial file.
+
+    :return: (sha256 hex digest, size in bytes)
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = artifact_path(digest, file_format, store_dir)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    return digest, len(data)
+
+
+def aggregate_payrolls(start, end, company_id=None):
+    """
+    Payroll totals per employee and payment month in [start, end), in one
+    grouped query. Both report types are assembled from these rows.
+    """
+    year = func.extract('year', Payroll.payment_date)
+    month = func.extract('month', Payroll.payment_date)
+    query = db.session.query(
+        Payroll.employee_id,
+        Employee.first_name,
+        Employee.last_name,
+        Employee.department,
+        year.label('year'),
+        month.label('month'),
+        func.count(Payroll.id).label('payrolls'),
+        func.coalesce(func.sum(Payroll.gross_salary), 0.0).label('gross'),
+        func.coalesce(func.sum(Payroll.bonuses), 0.0).label('bonuses'),
+        func.coalesce(func.sum(Payroll.deductions), 0.0).label('deductions'),
+        func.coalesce(func.sum(Payroll.tax_deduction), 0.0).label('tax'),
+        func.coalesce(func.sum(Payroll.net_salary), 0.0).label('net')
+    ).join(
+        Employee, Employee.id == Payroll.employee_id
+    ).filter(
+        within_period(Payroll.payment_date, start, end)
+    )
+    if company_id is not None:
+        query = query.filter(Payroll.company_id == company_id)
+    return query.group_by(
+        Payroll.employee_id, Employee.first_name, Employee.last_name, Employee.department, year, month
+    ).order_by(
+        year, month, Payroll.employee_id
+    ).all()
+
+
+def materialize_reports(start_date, end_date, report_types=REPORT_TYPES, company_id=None, store_dir=None):
+    """
+    Compute and persist monthly and per-employee reports for the calendar
+    months covering [start_date, end_date], rendering their PDF and CSV into
+    content-addressed storage.
+
+    Existing reports for the same scope are updated in place. A report whose
+    CSV is unchanged keeps its PDF without re-rendering it.
+
+    :param report_types: Any of 'monthly' (one per month with payrolls) and
+                         'employee' (one per employee over the whole range)
+    :param company_id: Limit the reports to one company's payrolls
+    :return: List of PayrollReport rows, monthly reports first
+    """
+    unknown = set(report_types) - set(REPORT_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown report type(s): {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    start, end = month_range(start_date, end_date)
+    rows = aggregate_payrolls(start, end, company_id)
+
+    by_month, by_employee = {}, {}
+    for row in rows:
+        by_month.setdefault((int(row.year), int(row.month)), []).append(row)
+        by_employee.setdefault(row.employee_id, []).append(row)
+
+    existing = _existing_reports(report_types, start, end, company_id)
+    reports, rendered = [], 0
+    if 'monthly' in report_types:
+        for (year, month), month_rows in sorted(by_month.items()):
+            first, next_first = month_bounds(year, month)
+            key = ('monthly', None, first, next_first - timedelta(days=1))
+            report, did_render = _save_report(existing.get(key), key, company_id, month_rows, store_dir)
+            reports.append(report)
+            rendered += did_render
+    if 'employee' in report_types:
+        for employee_id, employee_rows in sorted(by_employee.items()):
+            key = ('employee', employee_id, start, end - timedelta(days=1))
+            report, did_render = _save_report(existing.get(key), key, company_id, employee_rows, store_dir)
+            reports.append(report)
+            rendered += did_render
+
+    # The scope was recomputed in full, so reports it no longer produces are stale
+    produced = {id(report) for report in reports}
+    for report in existing.values():
+        if id(report) not in produced:
+            db.session.delete(report)
+
+    db.session.commit()
+    logger.info(f"Materialized {len(reports)} payroll reports ({rendered} PDFs rendered) "
+                f"from {len(rows)} aggregate rows in {time.perf_counter() - started:.2f}s")
+    return reports
+
+
+def _scope_filter(report_type, start, end, company_id):
+    """
+    Reports of one type belonging to the months [start, end): monthly reports
+    for any month inside it, employee reports for exactly that range (an
+    employee report over a narrower or wider range is a different report).
+    """
+    if report_type == 'monthly':
+        period = and_(PayrollReport.period_start >= start, PayrollReport.period_end < end)
+    else:
+        period = and_(PayrollReport.period_start == start, PayrollReport.period_end == end - timedelta(days=1))
+    company = PayrollReport.company_id.is_(None) if company_id is None else PayrollReport.company_id == company_id
+    return and_(PayrollReport.report_type == report_type, period, company)
+
+
+def find_reports(report_type, start_date, end_date, company_id=None):
+    """Materialized reports of one type for the calendar months covering [start_date, end_date]"""
+    start, end = month_range(start_date, end_date)
+    return PayrollReport.query.filter(
+        _scope_filter(report_type, start, end, company_id)
+    ).order_by(
+        PayrollReport.period_start, PayrollReport.employee_id
+    ).all()
+
+
+def _existing_reports(report_types, start, end, company_id):
+    """Reports already stored for this scope, keyed like materialize_reports builds them"""
+    query = PayrollReport.query.filter(or_(*[
+        _scope_filter(report_type, start, end, company_id) for report_type in report_types
+    ]))
+    return {
+        (report.report_type, report.employee_id, report.period_start, report.period_end): report
+        for report in query
+    }
+
+
+def _save_report(report, key, company_id, rows, store_dir):
+    report_type, employee_id, period_start, period_end = key
+    if report is None:
+        report = PayrollReport(report_type=report_type, company_id=company_id, employee_id=employee_id,
+                               period_start=period_start, period_end=period_end)
+        db.session.add(report)
+
+    report.total_employees = len({row.employee_id for row in rows})
+    report.total_payrolls = sum(row.payrolls for row in rows)
+    report.total_gross = round(sum(row.gross for row in rows), 2)
+    report.total_bonuses = round(sum(row.bonuses for row in rows), 2)
+    report.total_deductions = round(sum(row.deductions for row in rows), 2)
+    report.total_tax = round(sum(row.tax for row in rows), 2)
+    report.total_salaries_paid = round(sum(row.net for row in rows), 2)
+
+    headers, lines = _report_table(report, rows)
+    csv_digest, csv_size = store_artifact(render_csv(headers, lines), 'csv', store_dir)
+
+    # The CSV holds the whole table, so an unchanged CSV means an unchanged PDF
+    did_render = (csv_digest != report.csv_digest or report.pdf_digest is None
+                  or not os.path.exists(artifact_path(report.pdf_digest, 'pdf', store_dir)))
+    if did_render:
+        report.pdf_digest, report.pdf_size = store_artifact(
+            render_pdf(report.title, headers, lines), 'pdf', store_dir
+        )
+    if csv_digest != report.csv_digest or did_render:
+        report.generated_at = datetime.utcnow()
+    report.csv_digest, report.csv_size = csv_digest, csv_size
+    return report, did_render
+
+
+def start_report_build(report_type, start_date, end_date, company_id=None, created_by=None):
+    """
+    Queue a background build of one report type for the calendar months
+    covering [start_date, end_date], or return the build already pending or
+    running for that scope.
+    """
+    if report_type not in REPORT_TYPES:
+        raise ValueError(f"Unknown report type: {report_type}")
+    start, end = month_range(start_date, end_date)
+    period_end = end - timedelta(days=1)
+
+    build = PayrollReportBuild.query.filter(
+        PayrollReportBuild.report_type == report_type,
+        PayrollReportBuild.company_id.is_(None) if company_id is None else PayrollReportBuild.company_id == company_id,
+        PayrollReportBuild.period_start == start,
+        PayrollReportBuild.period_end == period_end,
+        PayrollReportBuild.status.in_(('pending', 'running'))
+    ).first()
+    if build is not None:
+        return build
+
+    build = PayrollReportBuild(report_type=report_type, company_id=company_id, period_start=start,
+                               period_end=period_end, created_by=created_by)
+    db.session.add(build)
+    db.session.commit()
+    build_payroll_reports.delay(build.id)
+    db.session.refresh(build)  # reflects the result when tasks run eagerly
+    return build
+
+
+@shared_task(name='payroll_reports.build', bind=True, max_retries=2, default_retry_delay=10)
+def build_payroll_reports(self, build_id):
+    """
+    Materialize a build's reports. A concurrent build of an overlapping scope
+    can insert the same report first (uq_payroll_reports_scope); the build is
+    then retried and updates that report instead.
+    """
+    build = db.session.get(PayrollReportBuild, build_id)
+    if build is None or not build.is_active:
+        return 0
+
+    build.status = 'running'
+    build.started_at = build.started_at or datetime.utcnow()
+    db.session.commit()
+    try:
+        reports = materialize_reports(build.period_start, build.period_end, [build.report_type], build.company_id)
+    except IntegrityError as e:
+        db.session.rollback()
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Report build {build_id}: retrying after a concurrent build wrote the same reports")
+            raise self.retry(exc=e)
+        _finish_build(build_id, error=str(e))
+        return 0
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Report build {build_id} failed: {e}")
+        _finish_build(build_id, error=str(e))
+        return 0
+
+    _finish_build(build_id, report_count=len(reports))
+    return len(reports)
+
+
+def _finish_build(build_id, report_count=0, error=None):
+    build = db.session.get(PayrollReportBuild, build_id)
+    build.status = 'failed' if error else 'completed'
+    build.report_count = report_count
+    build.error = error
+    build.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _amounts(payrolls, gross, bonuses, deductions, tax, net):
+    return [payrolls] + [f"{value:.2f}" for value in (gross, bonuses, deductions, tax, net)]
+
+
+def _report_table(report, rows):
+    """(headers, lines) shared by the CSV and PDF renderings, ending with a totals line"""
+    if report.report_type == 'employee':
+        first = rows[0]
+        headers = ['Month'] + AMOUNT_HEADERS
+        lines = [[f"{int(row.year):04d}-{int(row.month):02d}"] + _amounts(
+            row.payrolls, row.gross, row.bonuses, row.deductions, row.tax, row.net
+        ) for row in rows]
+        label = f"Total {first.first_name} {first.last_name}"
+    else:
+        headers = ['Employee ID', 'Employee', 'Department'] + AMOUNT_HEADERS
+        lines = [[row.employee_id, f"{row.first_name} {row.last_name}", row.department or ''] + _amounts(
+            row.payrolls, row.gross, row.bonuses, row.deductions, row.tax, row.net
+        ) for row in rows]
+        label = 'Total'
+
+    padding = [''] * (len(headers) - len(AMOUNT_HEADERS) - 1)
+    lines.append([label] + padding + _amounts(
+        report.total_payrolls, report.total_gross, report.total_bonuses, report.total_deductions,
+        report.total_tax, report.total_salaries_paid
+    ))
+    return headers, lines
+
+
+def render_csv(headers, lines):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    writer.writerows(lines)
+    return buffer.getvalue().encode('utf-8')
+
+
+def render_pdf(title, headers, lines):
+    """
+    Render a report table as a PDF. The canvas is invariant (no timestamps or
+    random document ids), so equal tables produce byte-identical files.
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter, invariant=1)
+    width, height = letter
+    column_width = (width - 80) / len(headers)
+
+    def draw_row(values, y, font):
+        c.setFont(font, 8)
+        for i, value in enumerate(values):
+            c.drawString(40 + i * column_width, y, str(value)[:24])
+
+    for page_start in range(0, len(lines), PDF_LINES_PER_PAGE):
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(40, height - 50, title)
+        draw_row(headers, height - 80, "Helvetica-Bold")
+        y = height - 96
+        for line in lines[page_start:page_start + PDF_LINES_PER_PAGE]:
+            draw_row(line, y, "Helvetica")
+            y -= 13
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def prune_artifacts(store_dir=None):
+    """Delete stored artifacts no report refers to any more; returns the number removed."""
+    referenced = set()
+    for pdf_digest, csv_digest in db.session.query(PayrollReport.pdf_digest, PayrollReport.csv_digest):
+        referenced.update(digest for digest in (pdf_digest, csv_digest) if digest)
+
+    removed = 0
+    root = store_dir or REPORT_STORE_DIR
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.tmp'):
+                continue
+            digest = filename.split('.', 1)[0]
+            if digest not in referenced:
+                os.remove(os.path.join(directory, filename))
+                removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    import tempfile
+    from datetime import date
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    store = tempfile.mkdtemp(prefix='payroll_reports_')
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Employee.__table__.insert(), [
+            {'id': i, 'employee_id': i, 'first_name': 'Report', 'last_name': str(i), 'email': f'report{i}@example.com',
+             'hire_date': date(2020, 1, 1), 'position': 'Engineer', 'department': f'Dept {i % 8}', 'salary': 5000.0}
+            for i in range(1, 2001)
+        ])
+        db.session.execute(Payroll.__table__.insert(), [
+            {'employee_id': i, 'basic_salary': 5000.0, 'bonuses': 100.0, 'deductions': 800.0, 'gross_salary': 5100.0,
+             'tax_deduction': 300.0, 'net_salary': 4300.0, 'payment_date': date(2024, month, 28)}
+            for month in range(1, 7) for i in range(1, 2001)
+        ])
+        db.session.commit()
+
+        for attempt in ('first run', 'unchanged re-run'):
+            started = time.perf_counter()
+            reports = materialize_reports(date(2024, 1, 1), date(2024, 6, 30), store_dir=store)
+            print(f"{attempt}: {len(reports)} reports in {time.perf_counter() - started:.2f}s")
+
+        monthly = reports[0]
+        started = time.perf_counter()
+        with open(artifact_path(monthly.pdf_digest, 'pdf', store), 'rb') as f:
+            size = len(f.read())
+        print(f"{monthly.title}: {size} byte PDF read back in {(time.perf_counter() - started) * 1000:.2f} ms")
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload, selectinload
+
+from models.payroll import Payroll
+from services.payroll_import import PAYMENT_STATUSES
+from services.periods import period_bounds, within_period
+from app import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Only what a search result lists; every column is in the search indexes
+SEARCH_COLUMNS = [
+    Payroll.id,
+    Payroll.employee_id,
+    Payroll.company_id,
+    Payroll.payment_date,
+    Payroll.payment_status,
+    Payroll.gross_salary,
+    Payroll.net_salary
+]
+
+
+def clamp_page_size(limit):
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(row):
+    """Keyset cursor for the row a page ended on: '<payment_date>.<id>'"""
+    return f"{row.payment_date.isoformat()}.{row.id}"
+
+
+def decode_cursor(token):
+    """
+    :return: (payment_date, id) from encode_cursor
+    :raises ValueError: If the token is malformed
+    """
+    payment_date, _, payroll_id = token.partition('.')
+    return date.fromisoformat(payment_date), int(payroll_id)
+
+
+def _search_query(employee_id=None, company_id=None, status=None, start_date=None, end_date=None, after=None):
+    """
+    Projected payroll rows, newest payment date first, starting after the
+    (payment_date, id) cursor.
+
+    The order matches the trailing (payment_date, id) of whichever search
+    index leads with the filtered column, so a page is a short index range
+    read with no sort; payrolls without a payment date are not listed.
+    """
+    query = db.session.query(*SEARCH_COLUMNS).filter(
+        Payroll.payment_date.isnot(None)
+    ).order_by(
+        Payroll.payment_date.desc(), Payroll.id.desc()
+    )
+    if employee_id is not None:
+        query = query.filter(Payroll.employee_id == employee_id)
+    if company_id is not None:
+        query = query.filter(Payroll.company_id == company_id)
+    if status:
+        query = query.filter(Payroll.payment_status == status)
+    if start_date and end_date:
+        query = query.filter(within_period(Payroll.payment_date, *period_bounds(start_date, end_date)))
+    elif start_date:
+        query = query.filter(Payroll.payment_date >= start_date)
+    elif end_date:
+        query = query.filter(Payroll.payment_date < end_date + timedelta(days=1))
+    if after is not None:
+        after_date, after_id = after
+        # Written as a bound plus a tie-break so the payment_date range stays sargable
+        query = query.filter(
+            Payroll.payment_date <= after_date,
+            or_(Payroll.payment_date < after_date, and_(Payroll.payment_date == after_date, Payroll.id < after_id))
+        )
+    return query
+
+
+def search_payrolls(employee_id=None, company_id=None, status=None, start_date=None, end_date=None,
+                    after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Search payrolls by employee, company, status and payment date range.
+
+    :param start_date: First payment date to include
+    :param end_date: Last payment date to include (inclusive)
+    :param after: Cursor from the previous page's next_after (None for the first page)
+    :param limit: Page size, clamped to MAX_PAGE_SIZE
+    :return: (rows, next_after) where next_after is None on the last page
+    :raises ValueError: On an unknown status, a malformed cursor or end_date before start_date
+    """
+    if status and status not in PAYMENT_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(PAYMENT_STATUSES)}")
+    limit = clamp_page_size(limit)
+    cursor = decode_cursor(after) if after else None
+
+    rows = _search_query(employee_id, company_id, status, start_date, end_date, cursor).limit(limit + 1).all()
+    next_after = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_after
+
+
+def row_dict(row):
+    return {
+        'payroll_id': row.id,
+        'employee_id': row.employee_id,
+        'company_id': row.company_id,
+        'payment_date': row.payment_date.isoformat(),
+        'payment_status': row.payment_status,
+        'gross_salary': row.gross_salary,
+        'net_salary': row.net_salary
+    }
+
+
+def get_payroll_details(payroll_id):
+    """
+    One payroll with its employee, benefits and other deductions, in three
+    queries regardless of how many line items it has (None if not found).
+    """
+    return db.session.query(Payroll).options(
+        joinedload(Payroll.employee),
+        selectinload(Payroll.benefits),
+        selectinload(Payroll.other_deductions)
+    ).filter(
+        Payroll.id == payroll_id
+    ).one_or_none()
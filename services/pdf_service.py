@@ -1,31 +1,208 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from pypdf import PdfReader, PdfWriter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import io
 import os
+import tempfile
+import time
 
-def generate_payslip(employee_name, salary, deductions, net_pay, output_path):
-    """Generate a PDF payslip for an employee."""
-    if not os.path.exists(os.path.dirname(output_path)):
-        os.makedirs(os.path.dirname(output_path))
-    
-    c = canvas.Canvas(output_path, pagesize=letter)
-    width, height = letter
-    
+PAYSLIP_FORM = "payslip_static"
+
+
+def _draw_static_form(c, height):
+    """Define the page furniture shared by every payslip as a reusable form XObject."""
+    c.beginForm(PAYSLIP_FORM)
     c.setFont("Helvetica-Bold", 16)
     c.drawString(200, height - 50, "Company Name - Payslip")
     c.setFont("Helvetica", 12)
-    
+    c.line(50, height - 210, 500, height - 210)
+    c.drawString(50, height - 240, "Thank you for your service!")
+    c.endForm()
+
+
+def _draw_payslip_fields(c, height, employee_name, salary, deductions, net_pay):
+    """Draw the per-employee part of a payslip page."""
+    c.setFont("Helvetica", 12)
     c.drawString(50, height - 100, f"Employee Name: {employee_name}")
     c.drawString(50, height - 130, f"Basic Salary: ${salary:.2f}")
     c.drawString(50, height - 160, f"Deductions: ${deductions:.2f}")
     c.drawString(50, height - 190, f"Net Pay: ${net_pay:.2f}")
-    
-    c.line(50, height - 210, 500, height - 210)
-    c.drawString(50, height - 240, "Thank you for your service!")
-    
+
+
+def _ensure_parent_dir(path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+
+def generate_payslip(employee_name, salary, deductions, net_pay, output_path):
+    """Generate a PDF payslip for an employee."""
+    _ensure_parent_dir(output_path)
+
+    c = canvas.Canvas(output_path, pagesize=letter)
+    width, height = letter
+
+    _draw_static_form(c, height)
+    c.doForm(PAYSLIP_FORM)
+    _draw_payslip_fields(c, height, employee_name, salary, deductions, net_pay)
+
     c.save()
     return output_path
 
+
+def _payslip_filename(record, index):
+    return f"payslip_{record.get('employee_id', index)}.pdf"
+
+
+def _render_payslip_pages(c, height, records):
+    """Draw one page per record on a canvas whose static form is already defined."""
+    count = 0
+    for record in records:
+        c.doForm(PAYSLIP_FORM)
+        _draw_payslip_fields(
+            c, height, record['employee_name'], record['salary'], record['deductions'], record['net_pay']
+        )
+        c.showPage()
+        count += 1
+    return count
+
+
+def _render_payslip_document(records, output):
+    """Write every record as one page of a single PDF, sharing one static form."""
+    c = canvas.Canvas(output, pagesize=letter)
+    width, height = letter
+    _draw_static_form(c, height)
+    count = _render_payslip_pages(c, height, records)
+    c.save()
+    return count
+
+
+def _render_payslip_chunk(job):
+    """Worker: write a chunk of records as pages of one PDF and return its path."""
+    records, output_path = job
+    _render_payslip_document(records, output_path)
+    return output_path
+
+
+def _render_payslip_files(job):
+    """
+    Worker: render a chunk as one document, so the static form is drawn once
+    per chunk, then split it into one file per record.
+    """
+    records, paths = job
+    buffer = io.BytesIO()
+    _render_payslip_document(records, buffer)
+    buffer.seek(0)
+    for page, output_path in zip(PdfReader(buffer).pages, paths):
+        writer = PdfWriter()
+        writer.add_page(page)
+        with open(output_path, 'wb') as output:
+            writer.write(output)
+    return paths
+
+
+def _chunks(records, chunk_size):
+    iterator = iter(records)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk, start
+        start += len(chunk)
+
+
+def _payslip_file_jobs(records, output_dir, chunk_size):
+    """Pair each chunk with its output paths, rejecting records that would share a file."""
+    seen = set()
+    jobs = []
+    for chunk, start in _chunks(records, chunk_size):
+        paths = []
+        for offset, record in enumerate(chunk):
+            filename = _payslip_filename(record, start + offset)
+            if filename in seen:
+                raise ValueError(f"Duplicate payslip for employee_id {record.get('employee_id', start + offset)!r}")
+            seen.add(filename)
+            paths.append(os.path.join(output_dir, filename))
+        jobs.append((chunk, paths))
+    return jobs
+
+
+def _concatenate_pdfs(paths, output_path):
+    _ensure_parent_dir(output_path)
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    with open(output_path, 'wb') as output:
+        writer.write(output)
+
+
+def generate_payslips_batch(records, output_dir="output", single_file=None, workers=None, chunk_size=500):
+    """
+    Generate payslips for many employees.
+
+    Records are rendered in chunks across a process pool; each chunk is one
+    document that draws the static form once and reuses it on every page.
+
+    :param records: Iterable of dicts with employee_name, salary, deductions,
+                    net_pay and optionally employee_id (used in file names;
+                    duplicates raise ValueError)
+    :param output_dir: Directory for per-employee files
+    :param single_file: If given, write all payslips as pages of this one PDF
+                        instead of one file per employee
+    :param workers: Process pool size (default: CPU count)
+    :param chunk_size: Records handed to a worker process at a time
+    :return: Dict with 'count', 'seconds', 'payslips_per_second' and 'paths'
+    """
+    started = time.perf_counter()
+
+    if single_file:
+        chunks = list(_chunks(records, chunk_size))
+        count = sum(len(chunk) for chunk, _ in chunks)
+        if len(chunks) <= 1 or (workers or os.cpu_count() or 1) == 1:
+            # Nothing to fan out, so skip the merge and render one document in-process
+            _ensure_parent_dir(single_file)
+            _render_payslip_document([record for chunk, _ in chunks for record in chunk], single_file)
+        else:
+            with tempfile.TemporaryDirectory() as chunk_dir:
+                jobs = [
+                    (chunk, os.path.join(chunk_dir, f"chunk_{start:09d}.pdf"))
+                    for chunk, start in chunks
+                ]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunk_paths = list(executor.map(_render_payslip_chunk, jobs))
+                _concatenate_pdfs(chunk_paths, single_file)
+        paths = [single_file]
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = _payslip_file_jobs(records, output_dir, chunk_size)
+        paths = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_paths in executor.map(_render_payslip_files, jobs):
+                paths.extend(chunk_paths)
+        count = len(paths)
+
+    seconds = time.perf_counter() - started
+    return {
+        'count': count,
+        'seconds': seconds,
+        'payslips_per_second': count / seconds if seconds > 0 else float('inf'),
+        'paths': paths
+    }
+
+
 if __name__ == "__main__":
     test_path = "output/payslip.pdf"
     generate_payslip("John Doe", 5000, 500, 4500, test_path)
     print(f"Payslip generated: {test_path}")
+
+    sample = [
+        {'employee_id': i, 'employee_name': f"Employee {i}", 'salary': 5000, 'deductions': 500, 'net_pay': 4500}
+        for i in range(2000)
+    ]
+    files = generate_payslips_batch(sample, output_dir="output/payslips")
+    print(f"{files['count']} payslip files: {files['payslips_per_second']:.0f} payslips/sec")
+    document = generate_payslips_batch(sample, single_file="output/payslips_all.pdf")
+    print(f"{document['count']} payslip pages: {document['payslips_per_second']:.0f} payslips/sec")
@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_
+
+
+def month_bounds(year, month):
+    """
+    Half-open [start, end) date range covering a calendar month.
+
+    :param year: Calendar year
+    :param month: Month number, 1-12
+    :return: (first day of the month, first day of the next month)
+    """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def current_month_bounds(today=None):
+    today = today or date.today()
+    return month_bounds(today.year, today.month)
+
+
+def period_bounds(start_date, end_date):
+    """
+    Half-open [start, end) range for an inclusive pay period such as a
+    start/end date pair entered in a form.
+
+    :param start_date: First day of the period (date or datetime)
+    :param end_date: Last day of the period, inclusive
+    :return: (start, day after end_date) as dates
+    """
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+    if end_date < start_date:
+        raise ValueError("Period end date is before its start date")
+    return start_date, end_date + timedelta(days=1)
+
+
+def within_period(column, start, end):
+    """
+    Filter clause for column values inside [start, end).
+
+    Compares the bare column against constants, so an index on the column is
+    used as a range scan (unlike extract('month', column) == month). Works for
+    both Date and DateTime columns: a DateTime on the last day of the period
+    is still before the exclusive end.
+    """
+    return and_(column >= start, column < end)
+
+
+def overlaps_period(start_column, end_column, start, end):
+    """
+    Filter clause for rows whose inclusive [start_column, end_column] span
+    shares at least one day with [start, end), e.g. leave touching a month.
+    """
+    return and_(start_column < end, end_column >= start)
@@ -1,3 +1,8 @@
+import numpy as np
+
+from services.payroll_records import PayrollBatch
+
+
 class SalaryCalculator:
     """
     This class provides utility functions to calculate salary components such as gross salary,
@@ -68,20 +73,126 @@ class SalaryCalculator:
         return gross_salary - total_deductions
 
     @classmethod
-    def process_payroll(cls, payroll):
-        """Compute all salary components and update the payroll record."""
-        payroll.overtime_amount = cls.calculate_overtime(payroll.overtime_hours, payroll.overtime_rate)
-        payroll.gross_salary = cls.calculate_gross_salary_static(
-            payroll.basic_salary, payroll.overtime_amount, payroll.allowances, payroll.bonuses
+    def _salary_components(cls, payroll):
+        """overtime_amount, gross_salary, total_deductions and net_salary for one payroll"""
+        overtime_amount = cls.calculate_overtime(payroll.overtime_hours, payroll.overtime_rate)
+        gross_salary = cls.calculate_gross_salary_static(
+            payroll.basic_salary, overtime_amount, payroll.allowances, payroll.bonuses
         )
-        payroll.total_deductions = cls.calculate_total_deductions(
+        total_deductions = cls.calculate_total_deductions(
             payroll.tax_deduction, payroll.insurance_deduction, payroll.other_deductions
         )
-        payroll.net_salary = cls.calculate_net_salary_static(payroll.gross_salary, payroll.total_deductions)
+        net_salary = cls.calculate_net_salary_static(gross_salary, total_deductions)
+        return {
+            'overtime_amount': overtime_amount,
+            'gross_salary': gross_salary,
+            'total_deductions': total_deductions,
+            'net_salary': net_salary
+        }
+
+    @classmethod
+    def process_payroll(cls, payroll):
+        """Compute all salary components and update the payroll record."""
+        for name, value in cls._salary_components(payroll).items():
+            setattr(payroll, name, value)
         return payroll
 
+    @classmethod
+    def process_record(cls, record):
+        """Compute all salary components of an immutable PayrollRecord and return the updated copy."""
+        return record.replace(**cls._salary_components(record))
+
+    # Columns consumed and produced by process_payroll_batch
+    BATCH_INPUT_COLUMNS = (
+        'basic_salary', 'overtime_hours', 'overtime_rate', 'allowances', 'bonuses',
+        'tax_deduction', 'insurance_deduction', 'other_deductions'
+    )
+    BATCH_OUTPUT_COLUMNS = ('overtime_amount', 'gross_salary', 'total_deductions', 'net_salary')
+
+    @classmethod
+    def process_payroll_batch(cls, columns):
+        """
+        Compute salary components for a whole pay run in one vectorized pass.
+
+        :param columns: PayrollBatch, DataFrame or mapping of column name -> array-like,
+                        holding the fields read by process_payroll (see BATCH_INPUT_COLUMNS)
+        :return: Same type as the input (PayrollBatch, DataFrame or dict of arrays)
+                 with the BATCH_OUTPUT_COLUMNS added. The input is not mutated.
+
+        The operations are applied in the same order as process_payroll, so every
+        row matches the per-record result exactly.
+        """
+        missing = [name for name in cls.BATCH_INPUT_COLUMNS if name not in columns]
+        if missing:
+            raise KeyError(f"Missing payroll columns: {', '.join(missing)}")
+
+        data = {name: np.asarray(columns[name], dtype=np.float64) for name in cls.BATCH_INPUT_COLUMNS}
+
+        overtime_amount = cls.calculate_overtime(data['overtime_hours'], data['overtime_rate'])
+        gross_salary = cls.calculate_gross_salary_static(
+            data['basic_salary'], overtime_amount, data['allowances'], data['bonuses']
+        )
+        total_deductions = cls.calculate_total_deductions(
+            data['tax_deduction'], data['insurance_deduction'], data['other_deductions']
+        )
+        net_salary = cls.calculate_net_salary_static(gross_salary, total_deductions)
+
+        results = {
+            'overtime_amount': overtime_amount,
+            'gross_salary': gross_salary,
+            'total_deductions': total_deductions,
+            'net_salary': net_salary
+        }
+
+        if isinstance(columns, PayrollBatch):
+            return columns.with_columns(**results)
+
+        if hasattr(columns, 'assign'):
+            # pandas DataFrame: return a new frame, keep the caller's untouched
+            return columns.assign(**results)
+
+        output = dict(columns)
+        output.update(results)
+        return output
+
 
 # Example usage:
 if __name__ == "__main__":
+    import time
+    from types import SimpleNamespace
+
     salary_calc = SalaryCalculator(base_salary=5000, bonuses=500, deductions=200)
     print(salary_calc.generate_salary_breakdown())
+
+    # Batch vs per-record benchmark over a synthetic pay run
+    n = 50000
+    rng = np.random.default_rng(42)
+    pay_run = {
+        'basic_salary': rng.uniform(2000, 12000, n).round(2),
+        'overtime_hours': rng.uniform(0, 20, n).round(1),
+        'overtime_rate': rng.uniform(15, 60, n).round(2),
+        'allowances': rng.uniform(0, 800, n).round(2),
+        'bonuses': rng.uniform(0, 1500, n).round(2),
+        'tax_deduction': rng.uniform(200, 3000, n).round(2),
+        'insurance_deduction': rng.uniform(0, 400, n).round(2),
+        'other_deductions': rng.uniform(0, 200, n).round(2)
+    }
+    records = [
+        SimpleNamespace(**{name: float(pay_run[name][i]) for name in SalaryCalculator.BATCH_INPUT_COLUMNS})
+        for i in range(n)
+    ]
+
+    start = time.perf_counter()
+    for record in records:
+        SalaryCalculator.process_payroll(record)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = SalaryCalculator.process_payroll_batch(pay_run)
+    batch_time = time.perf_counter() - start
+
+    for name in SalaryCalculator.BATCH_OUTPUT_COLUMNS:
+        assert np.array_equal(batch[name], [getattr(r, name) for r in records]), name
+
+    print(f"{n} payrolls: loop {loop_time:.3f}s, batch {batch_time:.4f}s "
+          f"({loop_time / batch_time:.0f}x faster, results identical)")
@@ -0,0 +1,8 @@
+def like_prefix(text, escape='\\'):
+    """
+    LIKE pattern matching values that start with text, with LIKE wildcards in
+    text escaped. Pass the same escape character to like()/ilike().
+    """
+    for char in (escape, '%', '_'):
+        text = text.replace(char, escape + char)
+    return text + '%'
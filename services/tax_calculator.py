@@ -1,3 +1,8 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
 class TaxCalculator:
     def __init__(self, tax_brackets):
         """
@@ -5,40 +10,83 @@ class TaxCalculator:
         :param tax_brackets: List of tuples (income_threshold, tax_rate)
         """
         self.tax_brackets = sorted(tax_brackets, key=lambda x: x[0])
-    
+        self._compile()
+
+    def _compile(self):
+        """
+        Precompute the bracket lookup table.
+
+        Bracket i covers (lower[i], thresholds[i]] and taxes it at rates[i];
+        cumulative_tax[i] is the tax owed on everything below lower[i]. An extra
+        zero-rate bracket past the last threshold caps the tax the same way the
+        bracket walk does when the table has no open-ended top bracket.
+        """
+        thresholds = [float(threshold) for threshold, _ in self.tax_brackets]
+        rates = [float(rate) for _, rate in self.tax_brackets]
+        lower = [0.0] + thresholds
+
+        cumulative_tax = [0.0]
+        tax = 0.0
+        for i, rate in enumerate(rates):
+            tax += (thresholds[i] - lower[i]) * rate
+            cumulative_tax.append(tax)
+
+        self._thresholds = thresholds
+        self._lower = lower
+        self._rates = rates + [0.0]
+        self._cumulative_tax = cumulative_tax
+
+        self._thresholds_array = np.array(thresholds, dtype=np.float64)
+        self._lower_array = np.array(lower, dtype=np.float64)
+        self._rates_array = np.array(self._rates, dtype=np.float64)
+        self._cumulative_tax_array = np.array(cumulative_tax, dtype=np.float64)
+
+    @classmethod
+    def for_jurisdiction(cls, jurisdiction=None, tax_year=None):
+        """
+        Return the shared calculator compiled from the tax rule registry.
+        :param jurisdiction: Jurisdiction code, e.g. 'NG' or 'US-FED'
+        :param tax_year: Tax year; defaults to the latest year on file
+        """
+        from services.tax_rules import get_tax_rules
+        return get_tax_rules(jurisdiction, tax_year).calculator
+
+    def tax_amount(self, salary):
+        """Unrounded progressive tax for a single salary."""
+        i = bisect_left(self._thresholds, salary)
+        return self._cumulative_tax[i] + (salary - self._lower[i]) * self._rates[i]
+
+    def tax_amount_many(self, salaries):
+        """Unrounded progressive tax for an array of salaries."""
+        salaries = np.asarray(salaries, dtype=np.float64)
+        i = np.searchsorted(self._thresholds_array, salaries, side='left')
+        return self._cumulative_tax_array[i] + (salaries - self._lower_array[i]) * self._rates_array[i]
+
     def calculate_tax(self, salary):
         """
         Calculate tax based on progressive tax brackets.
         :param salary: Employee's gross salary
         :return: Tax amount
         """
-        tax = 0.0
-        previous_threshold = 0
-        
-        for threshold, rate in self.tax_brackets:
-            if salary > threshold:
-                tax += (threshold - previous_threshold) * rate
-                previous_threshold = threshold
-            else:
-                tax += (salary - previous_threshold) * rate
-                break
-        
-        return round(tax, 2)
-
-# Example tax brackets (Nigeria PAYE Tax 2023 example)
-nigeria_tax_brackets = [
-    (300000, 0.07),  # 7% on first 300,000
-    (600000, 0.11),  # 11% on next 300,000
-    (1100000, 0.15), # 15% on next 500,000
-    (1600000, 0.19), # 19% on next 500,000
-    (3200000, 0.21), # 21% on next 1,600,000
-    (float('inf'), 0.24) # 24% on remaining income
-]
-
-def calculate_employee_tax(salary):
-    calculator = TaxCalculator(nigeria_tax_brackets)
+        return round(self.tax_amount(salary), 2)
+
+    def calculate_tax_many(self, salaries):
+        """
+        Calculate tax for an array of salaries in one vectorized pass.
+        :param salaries: Array-like of gross salaries
+        :return: NumPy array of tax amounts, rounded to the cent
+        """
+        return np.round(self.tax_amount_many(salaries), 2)
+
+
+def calculate_employee_tax(salary, jurisdiction='NG', tax_year=None):
+    calculator = TaxCalculator.for_jurisdiction(jurisdiction, tax_year)
     return calculator.calculate_tax(salary)
 
+def calculate_employee_tax_many(salaries, jurisdiction='NG', tax_year=None):
+    calculator = TaxCalculator.for_jurisdiction(jurisdiction, tax_year)
+    return calculator.calculate_tax_many(salaries)
+
 if __name__ == "__main__":
     sample_salary = 2500000
     print(f"Tax for salary {sample_salary}: NGN {calculate_employee_tax(sample_salary)}")
@@ -0,0 +1,124 @@
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from services.tax_calculator import TaxCalculator
+
+# Versioned tax rules per jurisdiction and tax year
+TAX_RULES_PATH = os.getenv("TAX_RULES_PATH", os.path.join(os.path.dirname(__file__), "tax_rules.json"))
+DEFAULT_JURISDICTION = os.getenv("TAX_JURISDICTION", "US-FED")
+
+
+@dataclass(frozen=True)
+class TaxRules:
+    """
+    Compiled, read-only tax rules for one jurisdiction and tax year.
+
+    Built once per (jurisdiction, tax_year) by get_tax_rules and shared by
+    every caller, so a pay run never re-parses or re-sorts brackets per row.
+    """
+    jurisdiction: str
+    tax_year: int
+    currency: str
+    calculator: TaxCalculator
+    social_security_rate: float
+    social_security_wage_base: float
+    medicare_rate: float
+    medicare_wage_base: float
+
+    def income_tax(self, annual_salary):
+        """Unrounded progressive income tax on an annual salary."""
+        if annual_salary <= 0:
+            return 0.0
+        return self.calculator.tax_amount(annual_salary)
+
+    def income_tax_many(self, annual_salaries):
+        """Unrounded income tax for an array of annual salaries."""
+        annual_salaries = np.asarray(annual_salaries, dtype=np.float64)
+        return np.where(annual_salaries > 0, self.calculator.tax_amount_many(annual_salaries), 0.0)
+
+    def social_security_tax(self, annual_salary):
+        """Social security tax, capped at the wage base."""
+        return min(annual_salary, self.social_security_wage_base) * self.social_security_rate
+
+    def social_security_tax_many(self, annual_salaries):
+        annual_salaries = np.asarray(annual_salaries, dtype=np.float64)
+        return np.minimum(annual_salaries, self.social_security_wage_base) * self.social_security_rate
+
+    def medicare_tax(self, annual_salary):
+        """Medicare tax, capped at the wage base if the jurisdiction has one."""
+        return min(annual_salary, self.medicare_wage_base) * self.medicare_rate
+
+    def medicare_tax_many(self, annual_salaries):
+        annual_salaries = np.asarray(annual_salaries, dtype=np.float64)
+        return np.minimum(annual_salaries, self.medicare_wage_base) * self.medicare_rate
+
+
+def _cap(value):
+    """Convert a JSON cap (null meaning no limit) to a float."""
+    return float('inf') if value is None else float(value)
+
+
+@lru_cache(maxsize=None)
+def _load_rule_file(path):
+    """Parse the rules file once per process."""
+    with open(path) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=64)
+def available_tax_years(jurisdiction, path=None):
+    """Return the tax years defined for a jurisdiction as a tuple, oldest first (sorted once per process)."""
+    rules = _load_rule_file(path or TAX_RULES_PATH)
+    if jurisdiction not in rules:
+        raise KeyError(f"No tax rules defined for jurisdiction {jurisdiction!r}")
+    return tuple(sorted(int(year) for year in rules[jurisdiction]))
+
+
+@lru_cache(maxsize=64)
+def _compile_tax_rules(jurisdiction, tax_year, path):
+    rules = _load_rule_file(path)
+    try:
+        entry = rules[jurisdiction][str(tax_year)]
+    except KeyError:
+        raise KeyError(f"No tax rules defined for {jurisdiction!r} in {tax_year}")
+
+    brackets = [(_cap(threshold), rate) for threshold, rate in entry["income_tax_brackets"]]
+    social_security = entry.get("social_security", {})
+    medicare = entry.get("medicare", {})
+
+    return TaxRules(
+        jurisdiction=jurisdiction,
+        tax_year=tax_year,
+        currency=entry.get("currency", ""),
+        calculator=TaxCalculator(brackets),
+        social_security_rate=float(social_security.get("rate", 0.0)),
+        social_security_wage_base=_cap(social_security.get("wage_base")),
+        medicare_rate=float(medicare.get("rate", 0.0)),
+        medicare_wage_base=_cap(medicare.get("wage_base"))
+    )
+
+
+def get_tax_rules(jurisdiction=None, tax_year=None, path=None):
+    """
+    Return the compiled tax rules for a jurisdiction and tax year.
+    :param jurisdiction: Jurisdiction code from the rules file (default DEFAULT_JURISDICTION)
+    :param tax_year: Tax year; defaults to the latest year on file
+    :param path: Alternative rules file, mainly for tests
+    :raises KeyError: If no rules exist for the jurisdiction/year
+    """
+    jurisdiction = jurisdiction or DEFAULT_JURISDICTION
+    path = path or TAX_RULES_PATH
+    if tax_year is None:
+        tax_year = available_tax_years(jurisdiction, path)[-1]
+    return _compile_tax_rules(jurisdiction, int(tax_year), path)
+
+
+def clear_tax_rules_cache():
+    """Drop parsed and compiled rules, e.g. after the rules file is updated."""
+    _compile_tax_rules.cache_clear()
+    available_tax_years.cache_clear()
+    _load_rule_file.cache_clear()
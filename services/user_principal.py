@@ -0,0 +1,116 @@
+from flask_login import UserMixin
+from sqlalchemy import func
+
+from models.user import User
+from models.employee import Employee
+from models.company import Company
+from services.cache import TTLCache
+from app import db
+
+USER_CACHE_TTL = 60  # seconds; overridden by the USER_CACHE_TTL config value
+
+principal_cache = TTLCache(ttl=USER_CACHE_TTL, maxsize=10000)
+
+
+class UserPrincipal(UserMixin):
+    """
+    Lightweight, detached identity used as current_user after login.
+
+    Holds only what authorization checks and templates read, so it can be
+    cached across requests without a database session. Anything else must be
+    loaded explicitly from User by id.
+    """
+
+    def __init__(self, id, username, email, first_name, last_name, role, active, is_enabled,
+                 company_id=None, employee_id=None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.role = role
+        self._active = bool(active)
+        self.is_enabled = bool(is_enabled)
+        self.company_id = company_id
+        self.employee_id = employee_id
+
+    @property
+    def is_active(self):
+        return self._active
+
+    @property
+    def name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_employee(self):
+        return self.role == 'employee'
+
+    @property
+    def is_manager(self):
+        return self.role == 'manager'
+
+    @property
+    def is_hr(self):
+        return self.role == 'hr'
+
+    def __repr__(self):
+        return f'<UserPrincipal {self.username}>'
+
+
+def _load_principal(user_id):
+    """
+    Build a principal with one query: the user, their employee record and company.
+
+    A user can have several employee records (one per company joined) and
+    administer several companies; the oldest employee record (lowest id)
+    wins, and company_id is that record's company, falling back to the
+    oldest company the user administers.
+    """
+    row = db.session.query(
+        User.id, User.username, User.email, User.first_name, User.last_name,
+        User.role, User.is_active, User.is_enabled,
+        func.coalesce(Employee.company_id, Company.id).label('company_id'),
+        Employee.id.label('employee_id')
+    ).outerjoin(
+        Employee, Employee.user_id == User.id
+    ).outerjoin(
+        Company, Company.admin_id == User.id
+    ).filter(
+        User.id == user_id
+    ).order_by(
+        Employee.id, Company.id
+    ).first()
+
+    if row is None:
+        return None
+    return UserPrincipal(
+        row.id, row.username, row.email, row.first_name, row.last_name, row.role,
+        row.is_active, row.is_enabled, row.company_id, row.employee_id
+    )
+
+
+def get_user_principal(user_id, ttl=None):
+    """
+    Resolve a Flask-Login user id to a cached UserPrincipal (None if the user is gone).
+    Cached per process until the TTL expires or invalidate_user is called.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _load_principal(user_id)
+        if principal is not None:
+            principal_cache.set(user_id, principal, ttl)
+    return principal
+
+
+def invalidate_user(user_id=None):
+    """Forget one cached principal (after a role change or deletion), or all of them."""
+    principal_cache.invalidate(user_id)
+
+
+def get_principal_cache_stats():
+    return principal_cache.stats()
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same budget as the check in agentic/nlp_processor.py's __main__ block
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def test_import_does_not_load_nltk():
+    """Importing the module in a fresh interpreter must stay cheap and leave NLTK unloaded."""
+    probe = ("import sys, time; t = time.perf_counter(); import agentic.nlp_processor; "
+             "print(time.perf_counter() - t, 'nltk' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            cwd=REPO_ROOT, check=True)
+    import_seconds, nltk_loaded = result.stdout.split()
+
+    assert nltk_loaded == 'False'
+    assert float(import_seconds) < IMPORT_BUDGET_SECONDS